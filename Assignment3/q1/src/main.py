@@ -52,14 +52,20 @@ class MedicalQAAssistant:
             
             # Get response from Ollama
             start_time = time.time()
-            response = self.ollama_client.generate(formatted_prompt)
+            stats = self.ollama_client.generate_with_stats(formatted_prompt)
             response_time = time.time() - start_time
             
+            # Ollama reports eval_duration in nanoseconds
+            eval_seconds = stats['eval_duration'] / 1e9
+            tokens_per_second = stats['eval_count'] / eval_seconds if eval_seconds > 0 else 0
+            
             return {
                 'query': query,
                 'prompt_type': prompt_type,
-                'response': response,
+                'response': stats['response'],
                 'response_time': response_time,
+                'eval_count': stats['eval_count'],
+                'tokens_per_second': tokens_per_second,
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -70,6 +76,8 @@ class MedicalQAAssistant:
                 'prompt_type': prompt_type,
                 'response': f"Error: {str(e)}",
                 'response_time': 0,
+                'eval_count': 0,
+                'tokens_per_second': 0,
                 'timestamp': datetime.now().isoformat()
             }
     
@@ -234,7 +242,7 @@ def main():
             assistant.print_results_summary()
             
             # Save results
-            save_results(assistant.results)
+            save_results(assistant.results, assistant.model_name)
             print("\n💾 Results saved to evaluation/output_logs.json")
             
         elif mode == '2':
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Multi-model comparison runner for the Medical Q&A Assistant
+Evaluates several local Ollama models over the same query set and reports
+throughput, latency percentiles and quality metrics side by side
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from main import MedicalQAAssistant
+from utils import load_queries, OllamaClient
+
+QUALITY_METRICS = [
+    'accuracy_score', 'reasoning_clarity', 'hallucination_score',
+    'consistency_score', 'safety_compliance'
+]
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+class ModelComparisonRunner:
+    def __init__(self, model_names: List[str], use_mock: bool = False):
+        """Initialize the runner with the models to compare"""
+        # Preserve order but drop duplicates so each model is loaded exactly once
+        self.model_names = list(dict.fromkeys(model_names))
+        self.use_mock = use_mock
+        self.model_results = {}
+        self.skipped_models = {}
+
+    def run_model(self, model_name: str, queries: List[Dict]) -> Optional[Dict[str, Any]]:
+        """Run every query and prompt type against one model before moving on"""
+        # Constructing the assistant sends a warm-up request, so model load
+        # time is paid here and not counted in the per-query latencies
+        assistant = MedicalQAAssistant(model_name, use_mock=self.use_mock)
+        client = type(assistant.ollama_client).__name__
+
+        # The assistant falls back to the mock client when the model or server is
+        # unavailable; its numbers must not be reported as this model's results
+        if not self.use_mock and not isinstance(assistant.ollama_client, OllamaClient):
+            print(f"⚠️  Skipping {model_name}: Ollama model not available ({client} in use)")
+            self.skipped_models[model_name] = client
+            return None
+
+        assistant.evaluate_all_prompts(queries)
+        assistant.calculate_performance_metrics()
+
+        # Free the server's memory before the next model is loaded
+        assistant.ollama_client.unload()
+
+        return {
+            'client': client,
+            'results': assistant.results,
+            'comparison_metrics': self.calculate_model_metrics(assistant.results)
+        }
+
+    def calculate_model_metrics(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Aggregate throughput, latency percentiles and quality across prompt types"""
+        all_results = [r for data in results.values() for r in data['query_results']]
+
+        latencies = [r.get('response_time', 0) for r in all_results]
+        total_tokens = sum(r.get('eval_count', 0) for r in all_results)
+        total_time = sum(latencies)
+
+        metrics = {
+            'total_queries': len(all_results),
+            'total_tokens': total_tokens,
+            'tokens_per_second': total_tokens / total_time if total_time > 0 else 0,
+            'latency_p50': percentile(latencies, 50),
+            'latency_p90': percentile(latencies, 90),
+            'latency_p99': percentile(latencies, 99),
+            'latency_mean': total_time / len(latencies) if latencies else 0
+        }
+
+        for metric in QUALITY_METRICS:
+            scores = [r.get(metric, 0) for r in all_results]
+            metrics[metric] = sum(scores) / len(scores) if scores else 0
+
+        # Accuracy points earned per second of mean latency
+        metrics['quality_per_second'] = (
+            metrics['accuracy_score'] / metrics['latency_mean'] if metrics['latency_mean'] > 0 else 0
+        )
+
+        return metrics
+
+    def run(self, queries: List[Dict]) -> None:
+        """Evaluate all models, scheduling work so each model is swapped in only once"""
+        print(f"🔬 Comparing {len(self.model_names)} models on {len(queries)} queries\n")
+
+        for i, model_name in enumerate(self.model_names):
+            print(f"{'='*60}")
+            print(f"Model {i+1}/{len(self.model_names)}: {model_name}")
+            print(f"{'='*60}")
+            result = self.run_model(model_name, queries)
+            if result is not None:
+                self.model_results[model_name] = result
+
+    def best_model(self) -> str:
+        """Return the model with the highest quality-per-second"""
+        if not self.model_results:
+            return ''
+        return max(self.model_results,
+                   key=lambda m: self.model_results[m]['comparison_metrics']['quality_per_second'])
+
+    def print_comparison(self) -> None:
+        """Print per-model metrics side by side"""
+        print("\n" + "="*96)
+        print("📊 MODEL COMPARISON")
+        print("="*96)
+        print(f"{'Model':<20}{'Tok/s':>8}{'p50 s':>8}{'p90 s':>8}{'p99 s':>8}"
+              f"{'Acc %':>8}{'Reason':>8}{'Halluc':>8}{'Safety %':>10}{'Q/s':>8}")
+        print("-"*96)
+
+        for model_name, data in self.model_results.items():
+            m = data['comparison_metrics']
+            print(f"{model_name[:19]:<20}{m['tokens_per_second']:>8.1f}{m['latency_p50']:>8.2f}"
+                  f"{m['latency_p90']:>8.2f}{m['latency_p99']:>8.2f}{m['accuracy_score']:>8.1f}"
+                  f"{m['reasoning_clarity']:>8.1f}{m['hallucination_score']:>8.1f}"
+                  f"{m['safety_compliance']:>10.1f}{m['quality_per_second']:>8.2f}")
+
+        for model_name, client in self.skipped_models.items():
+            print(f"{model_name[:19]:<20}skipped ({client} in use, model not available)")
+
+        print(f"\n🏆 BEST QUALITY-PER-SECOND: {self.best_model()}")
+        print("="*96)
+
+    def save_comparison(self, filename: str = "model_comparison.json") -> str:
+        """Save the comparison to the evaluation directory"""
+        output_data = {
+            'evaluation_metadata': {
+                'models': self.model_names,
+                'evaluation_date': datetime.now().isoformat(),
+                'best_quality_per_second': self.best_model(),
+                'clients': {model: data['client'] for model, data in self.model_results.items()},
+                'skipped_models': self.skipped_models
+            },
+            'comparison': {
+                model: data['comparison_metrics'] for model, data in self.model_results.items()
+            },
+            'results': {
+                model: data['results'] for model, data in self.model_results.items()
+            }
+        }
+
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        eval_dir = os.path.join(os.path.dirname(script_dir), "evaluation")
+        output_path = os.path.join(eval_dir, filename)
+
+        try:
+            os.makedirs(eval_dir, exist_ok=True)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(output_data, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving comparison: {str(e)}")
+
+        return output_path
+
+def main():
+    """Compare the models given on the command line (or prompted for)"""
+    model_names = sys.argv[1:]
+    if not model_names:
+        entered = input("Models to compare (comma-separated): ").strip()
+        model_names = [m.strip() for m in entered.split(',') if m.strip()]
+
+    if not model_names:
+        print("No models given.")
+        return
+
+    runner = ModelComparisonRunner(model_names)
+    runner.run(load_queries())
+    runner.print_comparison()
+    output_path = runner.save_comparison()
+    print(f"\n💾 Comparison saved to {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Utility functions for the Medical Q&A Assistant
 import json
 import os
 import re
+import time
 from datetime import datetime
 from typing import Dict, List, Any
 import requests
@@ -52,35 +53,85 @@ For your specific situation, I recommend:
 
 If this is a medical emergency, please contact emergency services immediately."""
 
+    def generate_with_stats(self, prompt: str) -> Dict[str, Any]:
+        """Generate mock response along with Ollama-style timing statistics"""
+        start_time = time.time()
+        response = self.generate(prompt)
+        elapsed_ns = int((time.time() - start_time) * 1e9)
+        return {
+            'response': response,
+            'eval_count': len(response.split()),
+            'eval_duration': elapsed_ns,
+            'prompt_eval_count': len(prompt.split()),
+            'load_duration': 0,
+            'total_duration': elapsed_ns
+        }
+
+    def unload(self) -> None:
+        """Nothing to unload for the mock client"""
+        pass
+
 class OllamaClient:
     """Client for interacting with Ollama API"""
     
-    def __init__(self, model_name: str, base_url: str = "http://localhost:11434"):
+    def __init__(self, model_name: str, base_url: str = "http://localhost:11434",
+                 keep_alive: str = "5m"):
         self.model_name = model_name
         self.base_url = base_url
+        self.keep_alive = keep_alive
         
     def generate(self, prompt: str) -> str:
         """Generate response from Ollama model"""
+        return self.generate_with_stats(prompt)['response']
+    
+    def generate_with_stats(self, prompt: str) -> Dict[str, Any]:
+        """Generate response and return it with Ollama's token/timing statistics"""
+        stats = {
+            'response': '',
+            'eval_count': 0,
+            'eval_duration': 0,
+            'prompt_eval_count': 0,
+            'load_duration': 0,
+            'total_duration': 0
+        }
         try:
             response = requests.post(
                 f"{self.base_url}/api/generate",
                 json={
                     "model": self.model_name,
                     "prompt": prompt,
-                    "stream": False
+                    "stream": False,
+                    "keep_alive": self.keep_alive
                 },
                 timeout=60
             )
             
             if response.status_code == 200:
-                return response.json().get("response", "No response generated")
+                data = response.json()
+                stats['response'] = data.get("response", "No response generated")
+                for key in ('eval_count', 'eval_duration', 'prompt_eval_count',
+                            'load_duration', 'total_duration'):
+                    stats[key] = data.get(key, 0)
             else:
-                return f"Error: HTTP {response.status_code}"
+                stats['response'] = f"Error: HTTP {response.status_code}"
                 
         except requests.exceptions.RequestException as e:
-            return f"Connection error: {str(e)}"
+            stats['response'] = f"Connection error: {str(e)}"
         except Exception as e:
-            return f"Unexpected error: {str(e)}"
+            stats['response'] = f"Unexpected error: {str(e)}"
+        
+        return stats
+    
+    def unload(self) -> None:
+        """Ask Ollama to evict this model from memory (keep_alive=0)"""
+        try:
+            requests.post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model_name, "keep_alive": 0},
+                timeout=30
+            )
+        except requests.exceptions.RequestException as e:
+            print(f"Warning: could not unload {self.model_name}: {str(e)}")
 
 def load_prompts() -> Dict[str, str]:
     """Load all prompt templates from files"""
@@ -263,11 +314,11 @@ This file tracks detected hallucinations from the Medical Q&A Assistant evaluati
     except Exception as e:
         print(f"Error creating hallucination log: {str(e)}")
 
-def save_results(results: Dict[str, Any]) -> None:
+def save_results(results: Dict[str, Any], model_name: str = "qwen3:8b") -> None:
     """Save evaluation results to JSON file"""
     output_data = {
         'evaluation_metadata': {
-            'model': 'qwen:0.5b',
+            'model': model_name,
             'evaluation_date': datetime.now().isoformat(),
             'total_queries': len(results.get('zero_shot', {}).get('query_results', [])),
             'prompt_types_tested': list(results.keys())
@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Any
+from logging_utils import log_event
+
+DOC_ID_PATTERN = re.compile(r"^doc_(\d+)$")
+
+
+class KnowledgeBaseStore:
+    """
+    Append-only storage for the document knowledge base.
+
+    The JSON snapshot (`doc_data.json`) holds the compacted documents and new
+    documents are appended as one JSON line each to `<snapshot>.log`, so an
+    insert writes a single line instead of rewriting the whole file. Once the
+    log grows past `compact_every` entries it is folded back into the snapshot,
+    which is written to a temp file and atomically swapped in. A torn last line
+    left by a crash is skipped on replay.
+    """
+
+    def __init__(self, kb_file: str, compact_every: int = 500):
+        self.kb_file = kb_file
+        self.log_file = f"{kb_file}.log"
+        self.compact_every = compact_every
+
+        self.documents: List[Dict[str, Any]] = []
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        # Position of each document in `documents`, so replacing one is O(1)
+        self.positions: Dict[str, int] = {}
+        self.log_entries = 0
+        self._max_doc_number = 0
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Load the snapshot and replay any appended documents"""
+        self.documents = []
+        self.by_id = {}
+        self.positions = {}
+        self.log_entries = 0
+        self._max_doc_number = 0
+
+        try:
+            with open(self.kb_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                for doc in data.get('documents', []):
+                    self._index(doc)
+        except FileNotFoundError:
+            log_event("Knowledge base file not found", logging.WARNING, name="kb_store", path=self.kb_file)
+        except json.JSONDecodeError:
+            log_event("Error parsing knowledge base JSON", logging.ERROR, name="kb_store", path=self.kb_file)
+
+        if os.path.exists(self.log_file):
+            with open(self.log_file, 'rb+') as f:
+                raw = f.read()
+                # Cut a torn last line from an interrupted append so the next
+                # append starts on a fresh line
+                if raw and not raw.endswith(b"\n"):
+                    raw = raw[:raw.rfind(b"\n") + 1]
+                    f.seek(0)
+                    f.truncate(len(raw))
+            for line in raw.decode('utf-8').splitlines():
+                try:
+                    doc = json.loads(line)
+                except json.JSONDecodeError:
+                    log_event("Skipping unreadable log entry", logging.WARNING, name="kb_store", path=self.log_file)
+                    continue
+                self._index(doc)
+                self.log_entries += 1
+
+        return self.documents
+
+    def _index(self, doc: Dict[str, Any]) -> None:
+        """Track a document in the list, the id index and the id counter"""
+        position = self.positions.get(doc['id'])
+        if position is not None:
+            self.documents[position] = doc
+        else:
+            self.positions[doc['id']] = len(self.documents)
+            self.documents.append(doc)
+        self.by_id[doc['id']] = doc
+
+        match = DOC_ID_PATTERN.match(doc['id'])
+        if match:
+            self._max_doc_number = max(self._max_doc_number, int(match.group(1)))
+
+    def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a document by ID"""
+        return self.by_id.get(document_id)
+
+    def next_id(self) -> str:
+        """Generate the next unused document ID"""
+        return f"doc_{self._max_doc_number + 1:03d}"
+
+    def append(self, doc: Dict[str, Any]) -> None:
+        """Durably append a document to the log"""
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._index(doc)
+        self.log_entries += 1
+
+        if self.log_entries >= max(self.compact_every, len(self.documents) // 2):
+            # The document is already durable in the log; a failed compaction must not
+            # look like a failed append (a retry would store it twice). The log is kept
+            # and compaction is retried on the next append.
+            try:
+                self.compact()
+            except Exception as e:
+                log_event("Compaction failed, keeping the append log", logging.ERROR,
+                          name="kb_store", path=self.kb_file, error=str(e))
+
+    def compact(self) -> None:
+        """Fold the log into the snapshot with an atomic file replace"""
+        tmp_file = f"{self.kb_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"documents": self.documents}, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.kb_file)
+
+        # The snapshot now holds everything, so the log can be dropped
+        if os.path.exists(self.log_file):
+            os.remove(self.log_file)
+        self.log_entries = 0
@@ -0,0 +1,276 @@
+import math
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from search_index import tokenize
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either few for from further
+had has have having he her here hers herself him himself his how however i if in into is it its
+itself just let may me might more most much must my myself no nor not of off on once only or other
+our ours ourselves out over own same shall she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up upon us very was we were
+what when where which while who whom why will with within without would you your yours yourself
+yourselves one two also can new use used using many well like make makes made
+""".split())
+
+NEGATORS = frozenset(["not", "no", "never", "without", "hardly", "cannot", "don", "doesn", "isn", "wasn", "aren", "won"])
+
+# Word -> polarity weight in [-1, 1]
+SENTIMENT_LEXICON = {
+    **{word: 1.0 for word in [
+        "excellent", "amazing", "outstanding", "wonderful", "fantastic", "exceptional", "remarkable",
+        "breakthrough", "revolutionary", "revolutionized", "revolutionizing", "transformative",
+    ]},
+    **{word: 0.6 for word in [
+        "good", "great", "positive", "success", "successful", "benefit", "benefits", "beneficial",
+        "improve", "improved", "improves", "improving", "improvement", "efficient", "efficiency",
+        "effective", "innovative", "innovation", "powerful", "promising", "advanced", "advances",
+        "advancement", "opportunity", "opportunities", "enable", "enables", "enabling", "enhance",
+        "enhanced", "enhances", "valuable", "reliable", "accurate", "progress", "growth", "helpful",
+        "secure", "safe", "easy", "better", "best", "solve", "solves", "solution", "solutions",
+    ]},
+    **{word: -0.6 for word in [
+        "bad", "negative", "problem", "problems", "issue", "issues", "risk", "risks", "concern",
+        "concerns", "challenge", "challenges", "difficult", "difficulty", "bias", "biased", "threat",
+        "threats", "attack", "attacks", "vulnerable", "vulnerability", "vulnerabilities", "error",
+        "errors", "fail", "fails", "failed", "limitation", "limitations", "harm", "harmful", "loss",
+        "worse", "worst", "weak", "costly", "slow", "unfair", "misuse", "danger", "dangerous",
+    ]},
+    **{word: -1.0 for word in [
+        "terrible", "awful", "horrible", "failure", "disaster", "catastrophic", "devastating",
+    ]},
+}
+
+# Vocabulary id shared by every token of analyzed text that no corpus document contains
+UNKNOWN_TERM = "\0"
+UNKNOWN_ID = 0
+
+
+def is_stopword(term: str) -> bool:
+    return term in STOPWORDS or len(term) <= 2 or term.isdigit()
+
+
+class LocalAnalysisEngine:
+    """
+    Offline keyword and sentiment analysis over the knowledge base.
+
+    Document frequencies are maintained incrementally as documents are added
+    or replaced, so IDF is always current without a rebuild. Keywords are
+    scored TF-IDF style with a YAKE-like boost for terms that appear early
+    in the text; sentiment is lexicon based with simple negation handling.
+    The bulk methods score many documents at once with NumPy. Only corpus
+    documents add terms to the vocabulary. In other analyzed text, unseen
+    tokens carry no sentiment weight, and for keywords they get temporary
+    per-call ids scored with the IDF of a term no document contains.
+    """
+
+    def __init__(self, negation_window: int = 3):
+        self.negation_window = negation_window
+        self.vocabulary: Dict[str, int] = {}
+        self.doc_freq = np.zeros(1024, dtype=np.int64)
+        self.doc_terms: Dict[str, List[int]] = {}
+
+        self.lexicon_weights = np.zeros(1024, dtype=np.float64)
+        self.negator_mask = np.zeros(1024, dtype=bool)
+        self.stopword_mask = np.zeros(1024, dtype=bool)
+
+        self.term_id(UNKNOWN_TERM)
+        self.stopword_mask[UNKNOWN_ID] = True
+        # Sentiment words must be scorable even when no document contains them
+        for term in list(SENTIMENT_LEXICON) + list(NEGATORS):
+            self.term_id(term)
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def term_id(self, term: str) -> int:
+        """Return the vocabulary id for a term, growing the per-term arrays as needed"""
+        term_id = self.vocabulary.get(term)
+        if term_id is not None:
+            return term_id
+
+        term_id = len(self.vocabulary)
+        self.vocabulary[term] = term_id
+        if term_id >= len(self.doc_freq):
+            new_size = len(self.doc_freq) * 2
+            self.doc_freq = np.resize(self.doc_freq, new_size)
+            self.doc_freq[term_id:] = 0
+            self.lexicon_weights = np.resize(self.lexicon_weights, new_size)
+            self.negator_mask = np.resize(self.negator_mask, new_size)
+            self.stopword_mask = np.resize(self.stopword_mask, new_size)
+
+        self.lexicon_weights[term_id] = SENTIMENT_LEXICON.get(term, 0.0)
+        self.negator_mask[term_id] = term in NEGATORS
+        self.stopword_mask[term_id] = is_stopword(term)
+        return term_id
+
+    def encode(self, text: str, add_terms: bool = False,
+               extra_terms: Optional[Dict[str, int]] = None) -> np.ndarray:
+        """
+        Tokenize text into an array of vocabulary ids
+
+        Unseen terms are added to the vocabulary if `add_terms`; otherwise
+        they get ids after the vocabulary from `extra_terms` when it is
+        given (filled in as new terms appear), or UNKNOWN_ID.
+        """
+        if add_terms:
+            return np.fromiter((self.term_id(token) for token in tokenize(text)), dtype=np.int64)
+        vocabulary = self.vocabulary
+        if extra_terms is None:
+            return np.fromiter((vocabulary.get(token, UNKNOWN_ID) for token in tokenize(text)), dtype=np.int64)
+
+        def lookup(token: str) -> int:
+            term_id = vocabulary.get(token)
+            if term_id is None:
+                term_id = extra_terms.setdefault(token, len(vocabulary) + len(extra_terms))
+            return term_id
+        return np.fromiter((lookup(token) for token in tokenize(text)), dtype=np.int64)
+
+    def build(self, documents: List[Dict[str, Any]]) -> None:
+        """Index document frequencies for the whole knowledge base"""
+        for doc in documents:
+            self.add_document(doc['id'], doc.get('content', ''))
+
+    def add_document(self, doc_id: str, text: str) -> None:
+        """Add (or replace) a document's terms in the corpus statistics"""
+        self.remove_document(doc_id)
+        unique_ids = np.unique(self.encode(text, add_terms=True))
+        self.doc_freq[unique_ids] += 1
+        self.doc_terms[doc_id] = unique_ids.tolist()
+
+    def remove_document(self, doc_id: str) -> None:
+        """Drop a document from the corpus statistics"""
+        term_ids = self.doc_terms.pop(doc_id, None)
+        if term_ids:
+            self.doc_freq[term_ids] -= 1
+
+    def idf(self) -> np.ndarray:
+        """Smoothed IDF for every vocabulary term"""
+        num_docs = len(self.doc_terms)
+        size = len(self.vocabulary)
+        idf = np.log((1 + num_docs) / (1 + self.doc_freq[:size])) + 1.0
+        idf[UNKNOWN_ID] = 0.0
+        return idf
+
+    def _encode_many(self, texts: List[str],
+                     extra_terms: Optional[Dict[str, int]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Concatenate token ids for many texts with their row and position arrays"""
+        encoded = [self.encode(text, extra_terms=extra_terms) for text in texts]
+        lengths = np.array([len(ids) for ids in encoded], dtype=np.int64)
+        token_ids = np.concatenate(encoded) if encoded else np.zeros(0, dtype=np.int64)
+        rows = np.repeat(np.arange(len(texts)), lengths)
+        # Position of each token within its own document
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.arange(len(token_ids)) - starts
+        return token_ids, rows, positions
+
+    def bulk_keywords(self, texts: List[str], limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Score keywords for many texts at once
+
+        Args:
+            texts (List[str]): Texts to analyze
+            limit (int): Maximum number of keywords per text
+
+        Returns:
+            One {"keywords", "keyword_scores", "total_words"} dict per text
+        """
+        # Terms outside the corpus get ids after the vocabulary for this call only
+        extra_terms: Dict[str, int] = {}
+        token_ids, rows, positions = self._encode_many(texts, extra_terms)
+        total_words = np.bincount(rows, minlength=len(texts))
+        size = len(self.vocabulary)
+        num_terms = size + len(extra_terms)
+
+        # An unseen term has document frequency 0
+        unseen_idf = math.log(1 + len(self.doc_terms)) + 1.0
+        idf = np.concatenate([self.idf(), np.full(len(extra_terms), unseen_idf)])
+        stopword_mask = np.concatenate([
+            self.stopword_mask[:size], np.array([is_stopword(term) for term in extra_terms], dtype=bool)
+        ])
+
+        keep = ~stopword_mask[token_ids]
+        token_ids, rows, positions = token_ids[keep], rows[keep], positions[keep]
+
+        # Collapse to unique (row, term) pairs with counts and first occurrence
+        pairs = rows * num_terms + token_ids
+        unique_pairs, first_index, counts = np.unique(pairs, return_index=True, return_counts=True)
+        pair_rows = unique_pairs // num_terms
+        pair_terms = unique_pairs - pair_rows * num_terms
+        first_position = positions[first_index]
+
+        doc_lengths = np.maximum(total_words[pair_rows], 1)
+        tf = counts / doc_lengths
+        position_boost = 1.0 + 1.0 / np.log2(2.0 + first_position / 10.0)
+        scores = tf * idf[pair_terms] * position_boost
+
+        # Sort by row, then by descending score
+        order = np.lexsort((-scores, pair_rows))
+        inverse_vocabulary = list(self.vocabulary) + list(extra_terms)
+
+        results = [{"keywords": [], "keyword_scores": [], "total_words": int(count)} for count in total_words]
+        row_starts = np.searchsorted(pair_rows[order], np.arange(len(texts)))
+        row_ends = np.searchsorted(pair_rows[order], np.arange(len(texts)), side='right')
+        for row, (start, end) in enumerate(zip(row_starts, row_ends)):
+            top = order[start:min(end, start + limit)]
+            if not len(top):
+                continue
+            top_scores = scores[top] / scores[top[0]]
+            results[row]["keywords"] = [inverse_vocabulary[term] for term in pair_terms[top]]
+            results[row]["keyword_scores"] = [round(float(score), 3) for score in top_scores]
+        return results
+
+    def bulk_sentiment(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Lexicon sentiment for many texts at once
+
+        Args:
+            texts (List[str]): Texts to analyze
+
+        Returns:
+            One {"sentiment", "confidence", "reasoning"} dict per text
+        """
+        token_ids, rows, _ = self._encode_many(texts)
+        weights = self.lexicon_weights[token_ids]
+
+        # Flip polarity of words within a short window after a negator
+        negators = self.negator_mask[token_ids]
+        negated = np.zeros(len(token_ids), dtype=bool)
+        for offset in range(1, self.negation_window + 1):
+            shifted = np.zeros(len(token_ids), dtype=bool)
+            shifted[offset:] = negators[:-offset] & (rows[offset:] == rows[:-offset])
+            negated |= shifted
+        weights = np.where(negated, -weights, weights)
+
+        totals = np.bincount(rows, weights=weights, minlength=len(texts))
+        hits = np.bincount(rows, weights=(weights != 0).astype(np.float64), minlength=len(texts))
+        lengths = np.bincount(rows, minlength=len(texts))
+
+        results = []
+        for total, hit_count, length in zip(totals, hits, lengths):
+            # Normalise by sqrt(length) so long documents don't saturate
+            score = total / math.sqrt(max(length, 1))
+            if score > 0.1:
+                sentiment = "positive"
+            elif score < -0.1:
+                sentiment = "negative"
+            else:
+                sentiment = "neutral"
+            confidence = min(0.95, 0.5 + abs(score) * 0.5 + min(hit_count, 10) * 0.02)
+            results.append({
+                "sentiment": sentiment,
+                "confidence": round(float(confidence), 2),
+                "reasoning": f"Lexicon analysis: {int(hit_count)} sentiment-bearing words, net score {score:.2f}"
+            })
+        return results
+
+    def keywords(self, text: str, limit: int = 10) -> Dict[str, Any]:
+        """Keyword scores for a single text"""
+        return self.bulk_keywords([text], limit)[0]
+
+    def sentiment(self, text: str) -> Dict[str, Any]:
+        """Lexicon sentiment for a single text"""
+        return self.bulk_sentiment([text])[0]
@@ -0,0 +1,42 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+logger = logging.getLogger("document_analyzer")
+# Silent unless explicitly enabled; the MCP stdio transport owns stdout
+logger.addHandler(logging.NullHandler())
+
+
+class JsonLogFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def configure_logging(level: str = None) -> None:
+    """Enable JSON logging to stderr, using DOC_ANALYZER_LOG_LEVEL if no level is given"""
+    level = level or os.getenv("DOC_ANALYZER_LOG_LEVEL")
+    if not level:
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonLogFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(level.upper())
+    logger.propagate = False
+
+
+def log_event(event: str, level: int = logging.INFO, name: str = None, **fields) -> None:
+    """Emit a structured log record; fields are only built into output when enabled"""
+    target = logger.getChild(name) if name else logger
+    if target.isEnabledFor(level):
+        target.log(level, event, extra={"fields": fields})
@@ -1,14 +1,24 @@
+import asyncio
+import hashlib
 import json
+import logging
 import os
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from rapidfuzz import fuzz, process
 import google.generativeai as genai
 from dotenv import load_dotenv
-from fastmcp import FastMCP
+from fastmcp import FastMCP, Context
+from search_index import SearchIndex
+from local_analysis import LocalAnalysisEngine
+from kb_store import KnowledgeBaseStore
+from logging_utils import configure_logging, log_event
+from rate_limiter import AsyncRateLimiter
 
 # Load environment variables
 load_dotenv()
+configure_logging()
 
 mcp =  FastMCP("My Mcp Server")
 
@@ -19,37 +29,89 @@ class DocumentAnalyzer:
             kb_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "doc_data.json")
         
         self.kb_file = kb_file
+        self.store = KnowledgeBaseStore(kb_file)
         self.documents = self.load_knowledge_base()
         
+        # Build search indexes once at load time
+        self.search_index = SearchIndex()
+        self.search_index.build(self.documents)
+        
+        # Corpus statistics for offline keyword/sentiment analysis
+        self.local_engine = LocalAnalysisEngine()
+        self.local_engine.build(self.documents)
+        
+        # Analysis results keyed by (content hash, use_llm)
+        self.analysis_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self.analysis_cache_size = 1024
+        
+        # Shared throttle for async Gemini calls (requests per minute)
+        self.rate_limiter = AsyncRateLimiter(int(os.getenv("GEMINI_RPM", "15")), period=60.0)
+        
         # Configure Google Gemini API
+        self.model = None
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
-            print("Warning: GOOGLE_API_KEY not found in environment variables")
-            print("Please set your Google API key in a .env file")
+            log_event("GOOGLE_API_KEY not found; set it in a .env file to enable Gemini", logging.WARNING)
         else:
             genai.configure(api_key=api_key)
             self.model = genai.GenerativeModel('gemini-1.5-flash')
     
     def load_knowledge_base(self) -> List[Dict]:
-        """Load documents from knowledge base JSON file"""
-        try:
-            with open(self.kb_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('documents', [])
-        except FileNotFoundError:
-            print(f"Knowledge base file '{self.kb_file}' not found")
-            return []
-        except json.JSONDecodeError:
-            print(f"Error parsing JSON from '{self.kb_file}'")
-            return []
+        """Load documents from the knowledge base snapshot and append log"""
+        return self.store.load()
     
     def save_knowledge_base(self):
-        """Save documents to knowledge base JSON file"""
+        """Compact all documents into the knowledge base JSON file"""
         try:
-            with open(self.kb_file, 'w', encoding='utf-8') as f:
-                json.dump({"documents": self.documents}, f, indent=2, ensure_ascii=False)
+            self.store.compact()
         except Exception as e:
-            print(f"Error saving knowledge base: {e}")
+            log_event("Error saving knowledge base", logging.ERROR, error=str(e))
+    
+    def local_sentiment(self, text: str) -> Dict[str, Any]:
+        """Lexicon-based sentiment used when Gemini is unavailable or not wanted"""
+        return self.local_engine.sentiment(text)
+    
+    def local_keywords(self, text: str, limit: int = 10) -> Dict[str, Any]:
+        """Corpus TF-IDF keywords used when Gemini is unavailable or not wanted"""
+        return self.local_engine.keywords(text, limit)
+    
+    def extract_keywords_bulk(self, document_ids: Optional[List[str]] = None, limit: int = 10) -> Dict[str, Any]:
+        """
+        Extract keywords for many documents offline, without any API calls
+        
+        Args:
+            document_ids (List[str]): Documents to analyze; defaults to the whole knowledge base
+            limit (int): Maximum number of keywords per document
+            
+        Returns:
+            Dict mapping document ID to keyword extraction results
+        """
+        if document_ids is None:
+            docs = self.documents
+        else:
+            docs = [self.store.get(document_id) for document_id in document_ids]
+            missing = [document_id for document_id, doc in zip(document_ids, docs) if doc is None]
+            if missing:
+                log_event("Documents not found", logging.WARNING, document_ids=missing)
+            docs = [doc for doc in docs if doc is not None]
+        
+        results = self.local_engine.bulk_keywords([doc['content'] for doc in docs], limit)
+        log_event("bulk_keyword_extraction", document_count=len(docs))
+        return {doc['id']: result for doc, result in zip(docs, results)}
+    
+    def local_readability(self, text: str) -> Dict[str, Any]:
+        """Sentence/word length readability used when Gemini is unavailable or not wanted"""
+        words = text.split()
+        sentences = [s for s in text.split('.') if s.strip()]
+        avg_sentence_length = len(words) / max(1, len(sentences))
+        avg_word_length = sum(len(word) for word in words) / max(1, len(words))
+        
+        return {
+            "readability_score": min(100, max(0, 100 - avg_sentence_length * 2)),
+            "reading_level": "high_school",
+            "avg_sentence_length": round(avg_sentence_length, 2),
+            "avg_word_length": round(avg_word_length, 2)
+        }
     
     def get_sentiment(self, text: str) -> Dict[str, Any]:
         """
@@ -94,32 +156,15 @@ class DocumentAnalyzer:
                     raise ValueError("No JSON found")
             except:
                 # Fallback: simple sentiment analysis
-                text_lower = text.lower()
-                if any(word in text_lower for word in ['good', 'great', 'excellent', 'amazing', 'positive', 'success', 'wonderful']):
-                    sentiment = "positive"
-                elif any(word in text_lower for word in ['bad', 'terrible', 'awful', 'negative', 'failure', 'problem', 'issue']):
-                    sentiment = "negative"
-                else:
-                    sentiment = "neutral"
-                
-                result = {
-                    "sentiment": sentiment,
-                    "confidence": 0.7,
-                    "reasoning": "Fallback analysis based on keyword detection"
-                }
+                result = self.local_sentiment(text)
             
-            # Print to console
-            print(f"Sentiment Analysis Results:")
-            print(f"Text: {text[:100]}...")
-            print(f"Sentiment: {result['sentiment']}")
-            print(f"Confidence: {result['confidence']}")
-            print(f"Reasoning: {result['reasoning']}")
-            print("-" * 50)
+            log_event("sentiment_analysis", text_preview=text[:100],
+                      sentiment=result['sentiment'], confidence=result['confidence'])
             
             return result
             
         except Exception as e:
-            print(f"Error in sentiment analysis: {e}")
+            log_event("Error in sentiment analysis", logging.ERROR, error=str(e))
             return {
                 "sentiment": "neutral",
                 "confidence": 0.5,
@@ -169,126 +214,210 @@ class DocumentAnalyzer:
                     raise ValueError("No JSON found")
             except:
                 # Fallback: simple keyword extraction
-                words = text.lower().split()
-                word_freq = {}
-                for word in words:
-                    word = word.strip('.,!?;:"()[]{}')
-                    if len(word) > 3:  # Only words longer than 3 characters
-                        word_freq[word] = word_freq.get(word, 0) + 1
-                
-                # Get top keywords
-                top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:limit]
-                keywords = [word for word, _ in top_words]
-                scores = [min(1.0, freq / max(word_freq.values())) for _, freq in top_words]
-                
-                result = {
-                    "keywords": keywords,
-                    "keyword_scores": scores,
-                    "total_words": len(words)
-                }
+                result = self.local_keywords(text, limit)
             
-            # Print to console
-            print(f"Keyword Extraction Results:")
-            print(f"Text: {text[:100]}...")
-            print(f"Keywords: {result['keywords']}")
-            print(f"Scores: {result['keyword_scores']}")
-            print(f"Total words: {result['total_words']}")
-            print("-" * 50)
+            log_event("keyword_extraction", text_preview=text[:100],
+                      keywords=result['keywords'], total_words=result['total_words'])
             
             return result
             
         except Exception as e:
-            print(f"Error in keyword extraction: {e}")
+            log_event("Error in keyword extraction", logging.ERROR, error=str(e))
             return {
                 "keywords": [],
                 "keyword_scores": [],
                 "total_words": len(text.split())
             }
     
-    def analyze_document(self, document_id: str) -> Dict[str, Any]:
+    def _combined_prompt(self, text: str, keyword_limit: int) -> str:
+        """Prompt asking Gemini for all three analyses in one JSON object"""
+        return f"""
+        Analyze the following text and provide a single JSON response with three sections:
+        1. sentiment: {{"sentiment": "positive/negative/neutral", "confidence": 0.0-1.0, "reasoning": "brief explanation"}}
+        2. keywords: {{"keywords": [top {keyword_limit} keywords], "keyword_scores": [0.0-1.0 per keyword], "total_words": word count}}
+        3. readability: {{"readability_score": 0-100 (higher = more readable), "reading_level": "elementary/middle_school/high_school/college/graduate", "avg_sentence_length": words per sentence, "avg_word_length": characters per word}}
+        
+        Text: "{text}"
+        
+        Response format:
+        {{
+            "sentiment": {{"sentiment": "positive", "confidence": 0.85, "reasoning": "Brief explanation here"}},
+            "keywords": {{"keywords": ["keyword1", "keyword2"], "keyword_scores": [0.9, 0.8], "total_words": 150}},
+            "readability": {{"readability_score": 75, "reading_level": "high_school", "avg_sentence_length": 15.2, "avg_word_length": 5.1}}
+        }}
+        """
+    
+    def _complete_sections(self, text: str, result: Dict[str, Any], keyword_limit: int) -> Dict[str, Any]:
+        """Fill any missing or malformed section of a combined result locally"""
+        fallback_used = False
+        if not isinstance(result.get('sentiment'), dict) or 'sentiment' not in result['sentiment']:
+            result['sentiment'] = self.local_sentiment(text)
+            fallback_used = True
+        if not isinstance(result.get('keywords'), dict) or 'keywords' not in result['keywords']:
+            result['keywords'] = self.local_keywords(text, keyword_limit)
+            fallback_used = True
+        if not isinstance(result.get('readability'), dict) or 'readability_score' not in result['readability']:
+            result['readability'] = self.local_readability(text)
+            fallback_used = True
+        
+        result['fallback_used'] = fallback_used
+        return result
+    
+    def combined_analysis(self, text: str, keyword_limit: int = 10) -> Dict[str, Any]:
+        """
+        Run sentiment, keyword and readability analysis in one Gemini call
+        
+        Args:
+            text (str): Text to analyze
+            keyword_limit (int): Maximum number of keywords to return
+            
+        Returns:
+            Dict with "sentiment", "keywords" and "readability" sections, plus
+            "fallback_used" when any section had to be computed locally
+        """
+        result = {}
+        try:
+            response = self.model.generate_content(
+                self._combined_prompt(text, keyword_limit),
+                generation_config={"response_mime_type": "application/json"}
+            )
+            result = json.loads(response.text)
+        except Exception as e:
+            log_event("Error in combined analysis, using local fallbacks", logging.WARNING, error=str(e))
+        
+        return self._complete_sections(text, result, keyword_limit)
+    
+    async def acombined_analysis(self, text: str, keyword_limit: int = 10) -> Dict[str, Any]:
+        """Async version of combined_analysis, throttled by the Gemini rate limiter"""
+        result = {}
+        try:
+            async with self.rate_limiter:
+                response = await self.model.generate_content_async(
+                    self._combined_prompt(text, keyword_limit),
+                    generation_config={"response_mime_type": "application/json"}
+                )
+            result = json.loads(response.text)
+        except Exception as e:
+            log_event("Error in combined analysis, using local fallbacks", logging.WARNING, error=str(e))
+        
+        return self._complete_sections(text, result, keyword_limit)
+    
+    def _lookup_sections(self, text: str, use_llm: bool):
+        """Return (cache_key, cached sections or None) for a document's text"""
+        cache_key = (hashlib.sha256(text.encode('utf-8')).hexdigest(), use_llm)
+        sections = self.analysis_cache.get(cache_key)
+        if sections is not None:
+            self.analysis_cache.move_to_end(cache_key)
+        return cache_key, sections
+    
+    def _cache_sections(self, cache_key: tuple, sections: Dict[str, Any]) -> None:
+        """Cache analysis sections, skipping local fallbacks from a failed Gemini call"""
+        if sections.get('fallback_used', False):
+            return
+        self.analysis_cache[cache_key] = sections
+        if len(self.analysis_cache) > self.analysis_cache_size:
+            self.analysis_cache.popitem(last=False)
+    
+    def _local_sections(self, text: str) -> Dict[str, Any]:
+        """All three analyses computed without the LLM"""
+        return {
+            "sentiment": self.local_sentiment(text),
+            "keywords": self.local_keywords(text, 10),
+            "readability": self.local_readability(text)
+        }
+    
+    def analyze_document(self, document_id: str, use_llm: bool = True) -> Dict[str, Any]:
         """
         Perform comprehensive analysis of a document
         
+        Results are cached by content hash, so re-analyzing an unchanged
+        document costs nothing and editing it invalidates the entry.
+        
         Args:
             document_id (str): ID of the document to analyze
+            use_llm (bool): Use Gemini; when False only local metrics are computed
             
         Returns:
             Dict containing complete document analysis
         """
         # Find document
-        doc = None
-        for document in self.documents:
-            if document['id'] == document_id:
-                doc = document
-                break
+        doc = self.store.get(document_id)
         
         if not doc:
-            print(f"Document with ID '{document_id}' not found")
+            log_event("Document not found", logging.WARNING, document_id=document_id)
             return {"error": f"Document with ID '{document_id}' not found"}
         
-        text = doc['content']
+        use_llm = use_llm and self.model is not None
+        cache_key, sections = self._lookup_sections(doc['content'], use_llm)
+        if sections is None:
+            if use_llm:
+                sections = self.combined_analysis(doc['content'], keyword_limit=10)
+            else:
+                sections = self._local_sections(doc['content'])
+            self._cache_sections(cache_key, sections)
+        
+        return self._build_analysis(doc, sections)
+    
+    async def aanalyze_document(self, document_id: str, use_llm: bool = True) -> Dict[str, Any]:
+        """Async version of analyze_document that doesn't block the event loop on Gemini"""
+        doc = self.store.get(document_id)
+        
+        if not doc:
+            log_event("Document not found", logging.WARNING, document_id=document_id)
+            return {"error": f"Document with ID '{document_id}' not found"}
         
-        # Perform all analyses
-        sentiment_result = self.get_sentiment(text)
-        keywords_result = self.extract_keywords(text, limit=10)
+        use_llm = use_llm and self.model is not None
+        cache_key, sections = self._lookup_sections(doc['content'], use_llm)
+        if sections is None:
+            if use_llm:
+                sections = await self.acombined_analysis(doc['content'], keyword_limit=10)
+            else:
+                sections = self._local_sections(doc['content'])
+            self._cache_sections(cache_key, sections)
+        
+        return self._build_analysis(doc, sections)
+    
+    async def aanalyze_documents(self, document_ids: List[str], use_llm: bool = True,
+                                 max_concurrency: int = 4) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze many documents concurrently, yielding each result as it completes
+        
+        Args:
+            document_ids (List[str]): IDs of the documents to analyze
+            use_llm (bool): Use Gemini; when False only local metrics are computed
+            max_concurrency (int): Maximum number of analyses in flight
+            
+        Yields:
+            Analysis dicts (or error dicts) in completion order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def analyze_one(document_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                result = await self.aanalyze_document(document_id, use_llm)
+            result.setdefault("document_id", document_id)
+            return result
+        
+        tasks = [asyncio.create_task(analyze_one(document_id)) for document_id in dict.fromkeys(document_ids)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def _build_analysis(self, doc: Dict[str, Any], sections: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine analysis sections with basic statistics for a document"""
+        document_id = doc['id']
+        text = doc['content']
+        sentiment_result = sections['sentiment']
+        keywords_result = sections['keywords']
+        readability_result = sections['readability']
         
         # Basic statistics
         words = text.split()
         sentences = text.split('.')
         
-        # Readability analysis using Gemini
-        try:
-            readability_prompt = f"""
-            Analyze the readability of the following text and provide a JSON response with:
-            1. readability_score: score from 0-100 (higher = more readable)
-            2. reading_level: "elementary", "middle_school", "high_school", "college", "graduate"
-            3. avg_sentence_length: average words per sentence
-            4. avg_word_length: average characters per word
-            
-            Text: "{text}"
-            
-            Response format:
-            {{
-                "readability_score": 75,
-                "reading_level": "high_school",
-                "avg_sentence_length": 15.2,
-                "avg_word_length": 5.1
-            }}
-            """
-            
-            response = self.model.generate_content(readability_prompt)
-            result_text = response.text.strip()
-            
-            # Try to extract JSON
-            try:
-                start = result_text.find('{')
-                end = result_text.rfind('}') + 1
-                if start != -1 and end != 0:
-                    json_str = result_text[start:end]
-                    readability_result = json.loads(json_str)
-                else:
-                    raise ValueError("No JSON found")
-            except:
-                # Fallback readability calculation
-                avg_sentence_length = len(words) / max(1, len([s for s in sentences if s.strip()]))
-                avg_word_length = sum(len(word) for word in words) / len(words)
-                
-                readability_result = {
-                    "readability_score": min(100, max(0, 100 - avg_sentence_length * 2)),
-                    "reading_level": "high_school",
-                    "avg_sentence_length": round(avg_sentence_length, 2),
-                    "avg_word_length": round(avg_word_length, 2)
-                }
-                
-        except Exception as e:
-            print(f"Error in readability analysis: {e}")
-            readability_result = {
-                "readability_score": 50,
-                "reading_level": "unknown",
-                "avg_sentence_length": 0,
-                "avg_word_length": 0
-            }
-        
         # Compile complete analysis
         analysis = {
             "document_id": document_id,
@@ -306,18 +435,10 @@ class DocumentAnalyzer:
             "analysis_timestamp": datetime.now().isoformat()
         }
         
-        # Print comprehensive results
-        print(f"Complete Document Analysis for '{doc['title']}':")
-        print(f"Document ID: {document_id}")
-        print(f"Category: {doc['metadata']['category']}")
-        print(f"Author: {doc['metadata']['createdby']}")
-        print(f"Word Count: {analysis['basic_stats']['word_count']}")
-        print(f"Sentence Count: {analysis['basic_stats']['sentence_count']}")
-        print(f"Sentiment: {sentiment_result['sentiment']} (confidence: {sentiment_result['confidence']})")
-        print(f"Top Keywords: {', '.join(keywords_result['keywords'][:5])}")
-        print(f"Readability Score: {readability_result['readability_score']}")
-        print(f"Reading Level: {readability_result['reading_level']}")
-        print("=" * 60)
+        log_event("document_analysis", document_id=document_id, title=doc['title'],
+                  word_count=analysis['basic_stats']['word_count'],
+                  sentiment=sentiment_result['sentiment'],
+                  readability_score=readability_result['readability_score'])
         
         return analysis
     
@@ -332,12 +453,7 @@ class DocumentAnalyzer:
             Dict containing the added document with generated ID
         """
         # Generate new ID
-        existing_ids = [doc['id'] for doc in self.documents]
-        new_id = f"doc_{len(existing_ids) + 1:03d}"
-        
-        # Ensure no ID conflicts
-        while new_id in existing_ids:
-            new_id = f"doc_{len(existing_ids) + len([i for i in existing_ids if i.startswith('doc_')]) + 1:03d}"
+        new_id = self.store.next_id()
         
         # Create new document
         new_doc = {
@@ -353,45 +469,99 @@ class DocumentAnalyzer:
             }
         }
         
-        # Add to documents
-        self.documents.append(new_doc)
-        
-        # Save to file
-        self.save_knowledge_base()
+        # Append to the knowledge base log (also updates self.documents)
+        try:
+            self.store.append(new_doc)
+        except Exception as e:
+            log_event("Error saving knowledge base", logging.ERROR, error=str(e))
+            return {"error": f"Failed to save document: {str(e)}"}
+        self.search_index.add_document(new_doc)
+        self.local_engine.add_document(new_doc['id'], new_doc['content'])
         
-        # Print confirmation
-        print(f"Document Added Successfully:")
-        print(f"ID: {new_doc['id']}")
-        print(f"Title: {new_doc['title']}")
-        print(f"Author: {new_doc['metadata']['createdby']}")
-        print(f"Category: {new_doc['metadata']['category']}")
-        print(f"Word Count: {new_doc['metadata']['word_count']}")
-        print("-" * 50)
+        log_event("document_added", document_id=new_doc['id'], title=new_doc['title'],
+                  category=new_doc['metadata']['category'],
+                  word_count=new_doc['metadata']['word_count'])
         
         return new_doc
     
-    def search_documents(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def update_document(self, document_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Edit an existing document's title, content or category
+        
+        Args:
+            document_id (str): ID of the document to edit
+            updates (Dict): Any of title, content, category
+            
+        Returns:
+            Dict containing the updated document
+        """
+        doc = self.store.get(document_id)
+        if not doc:
+            log_event("Document not found", logging.WARNING, document_id=document_id)
+            return {"error": f"Document with ID '{document_id}' not found"}
+        
+        old_hash = hashlib.sha256(doc['content'].encode('utf-8')).hexdigest()
+        content = updates.get('content', doc['content'])
+        
+        updated_doc = {
+            "id": document_id,
+            "title": updates.get('title', doc['title']),
+            "content": content,
+            "metadata": {
+                **doc['metadata'],
+                "time": datetime.now().isoformat(),
+                "category": updates.get('category', doc['metadata'].get('category', 'General')),
+                "word_count": len(content.split())
+            }
+        }
+        
+        try:
+            self.store.append(updated_doc)
+        except Exception as e:
+            log_event("Error saving knowledge base", logging.ERROR, error=str(e))
+            return {"error": f"Failed to save document: {str(e)}"}
+        self.search_index.add_document(updated_doc)
+        self.local_engine.add_document(document_id, content)
+        
+        # Drop cached analyses of the previous content
+        for cache_key in [key for key in self.analysis_cache if key[0] == old_hash]:
+            del self.analysis_cache[cache_key]
+        
+        log_event("document_updated", document_id=updated_doc['id'], title=updated_doc['title'])
+        
+        return updated_doc
+    
+    def search_documents(self, query: str, limit: int = 10, candidate_pool: int = 50) -> List[Dict[str, Any]]:
         """
         Search documents using fuzzy text matching
         
+        Candidates are shortlisted from the BM25/trigram index first, and
+        only those are re-ranked with fuzzy matching.
+        
         Args:
             query (str): Search query
             limit (int): Maximum number of results to return
+            candidate_pool (int): Minimum number of index candidates to re-rank
             
         Returns:
             List of matching documents with similarity scores
         """
         if not query.strip():
-            print("Empty query provided")
+            log_event("Empty query provided", logging.WARNING)
             return []
         
         results = []
+        query_lower = query.lower()
+        candidates = self.search_index.shortlist(query, max(limit * 5, candidate_pool))
         
-        for doc in self.documents:
+        for doc_id, _ in candidates:
+            doc = self.search_index.documents[doc_id]
+            fields = self.search_index.fields[doc_id]
+            
             # Calculate similarity scores for different fields
-            title_score = fuzz.partial_ratio(query.lower(), doc['title'].lower())
-            content_score = fuzz.partial_ratio(query.lower(), doc['content'].lower())
-            category_score = fuzz.partial_ratio(query.lower(), doc['metadata']['category'].lower())
+            title_score = fuzz.partial_ratio(query_lower, fields['title'])
+            content_score = fuzz.partial_ratio(query_lower, fields['content'])
+            category_score = fuzz.partial_ratio(query_lower, fields['category'])
             
             # Weighted average (title and category get higher weight)
             combined_score = (title_score * 0.4 + content_score * 0.4 + category_score * 0.2)
@@ -413,20 +583,8 @@ class DocumentAnalyzer:
         # Limit results
         results = results[:limit]
         
-        # Print search results
-        print(f"Search Results for '{query}':")
-        print(f"Found {len(results)} matching documents")
-        print("-" * 50)
-        
-        for i, result in enumerate(results, 1):
-            doc = result['document']
-            score = result['similarity_score']
-            print(f"{i}. {doc['title']} (ID: {doc['id']})")
-            print(f"   Category: {doc['metadata']['category']}")
-            print(f"   Author: {doc['metadata']['createdby']}")
-            print(f"   Similarity: {score:.1f}%")
-            print(f"   Content preview: {doc['content'][:100]}...")
-            print()
+        log_event("document_search", query=query, result_count=len(results),
+                  top_ids=[result['document']['id'] for result in results])
         
         return results
 
@@ -435,19 +593,43 @@ analyzer = DocumentAnalyzer()
 
 # Register MCP tools
 @mcp.tool()
-def analyze_document_tool(document_id: str) -> Dict[str, Any]:
+async def analyze_document_tool(document_id: str, use_llm: bool = True) -> Dict[str, Any]:
     """Analyze a document by ID and return comprehensive analysis"""
-    return analyzer.analyze_document(document_id)
+    return await analyzer.aanalyze_document(document_id, use_llm)
+
+@mcp.tool()
+async def analyze_documents_bulk_tool(document_ids: List[str], ctx: Context, use_llm: bool = True,
+                                      max_concurrency: int = 4) -> List[Dict[str, Any]]:
+    """Analyze many documents concurrently, streaming progress as each one completes"""
+    results = []
+    total = len(set(document_ids))
+    async for analysis in analyzer.aanalyze_documents(document_ids, use_llm, max_concurrency):
+        results.append(analysis)
+        await ctx.report_progress(len(results), total)
+        await ctx.info(json.dumps({
+            "document_id": analysis.get("document_id"),
+            "sentiment": analysis.get("sentiment_analysis", {}).get("sentiment"),
+            "readability_score": analysis.get("readability_analysis", {}).get("readability_score"),
+            "error": analysis.get("error")
+        }))
+    return results
 
 @mcp.tool()
-def get_sentiment_tool(text: str) -> Dict[str, Any]:
+async def get_sentiment_tool(text: str) -> Dict[str, Any]:
     """Get sentiment analysis for the provided text"""
-    return analyzer.get_sentiment(text)
+    async with analyzer.rate_limiter:
+        return await asyncio.to_thread(analyzer.get_sentiment, text)
 
 @mcp.tool()
-def extract_keywords_tool(text: str, limit: int = 10) -> Dict[str, Any]:
+async def extract_keywords_tool(text: str, limit: int = 10) -> Dict[str, Any]:
     """Extract keywords from the provided text"""
-    return analyzer.extract_keywords(text, limit)
+    async with analyzer.rate_limiter:
+        return await asyncio.to_thread(analyzer.extract_keywords, text, limit)
+
+@mcp.tool()
+def extract_keywords_bulk_tool(document_ids: Optional[List[str]] = None, limit: int = 10) -> Dict[str, Any]:
+    """Extract keywords for many documents (default: all) offline, without Gemini"""
+    return analyzer.extract_keywords_bulk(document_ids, limit)
 
 @mcp.tool()
 def add_document_tool(title: str, content: str, createdby: str = "Unknown", category: str = "General") -> Dict[str, Any]:
@@ -460,6 +642,12 @@ def add_document_tool(title: str, content: str, createdby: str = "Unknown", cate
     }
     return analyzer.add_document(document_data)
 
+@mcp.tool()
+def update_document_tool(document_id: str, title: Optional[str] = None, content: Optional[str] = None, category: Optional[str] = None) -> Dict[str, Any]:
+    """Edit an existing document in the knowledge base"""
+    updates = {"title": title, "content": content, "category": category}
+    return analyzer.update_document(document_id, {k: v for k, v in updates.items() if v is not None})
+
 @mcp.tool()
 def search_documents_tool(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     """Search documents using fuzzy text matching"""
@@ -0,0 +1,38 @@
+import asyncio
+import time
+from collections import deque
+
+
+class AsyncRateLimiter:
+    """
+    Sliding-window limiter for async API calls.
+
+    Allows at most `max_calls` acquisitions per `period` seconds; callers
+    beyond that wait until the oldest call leaves the window. Use as
+    `async with limiter:` around each request.
+    """
+
+    def __init__(self, max_calls: int, period: float = 60.0):
+        self.max_calls = max(1, max_calls)
+        self.period = period
+        self._calls = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a call slot is free in the current window"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                await asyncio.sleep(self.period - (now - self._calls[0]))
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
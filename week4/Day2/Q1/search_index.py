@@ -0,0 +1,145 @@
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Dict, List, Any, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used by both the inverted and trigram indexes"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def trigrams(term: str) -> set:
+    """Character trigrams of a term, padded so short terms still produce grams"""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    In-memory inverted index (BM25) plus a trigram index over the vocabulary.
+
+    The trigram index maps character trigrams to vocabulary terms, so query
+    terms that are misspelled or only a prefix ("learn" -> "learning") are
+    expanded to the indexed terms they overlap with before BM25 scoring.
+    Lowercased fields are kept per document so fuzzy re-ranking never has
+    to lowercase the corpus again.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, min_trigram_overlap: float = 0.6):
+        self.k1 = k1
+        self.b = b
+        self.min_trigram_overlap = min_trigram_overlap
+
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.trigram_index: Dict[str, set] = defaultdict(set)
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.fields: Dict[str, Dict[str, str]] = {}
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.total_length = 0
+        self._norms: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def build(self, documents: List[Dict[str, Any]]) -> None:
+        """Index every document in the knowledge base"""
+        for doc in documents:
+            self.add_document(doc)
+
+    def add_document(self, doc: Dict[str, Any]) -> None:
+        """Add (or replace) a single document in the index"""
+        doc_id = doc['id']
+        if doc_id in self.doc_lengths:
+            self.remove_document(doc_id)
+
+        title = doc.get('title', '').lower()
+        content = doc.get('content', '').lower()
+        category = doc.get('metadata', {}).get('category', '').lower()
+        self.fields[doc_id] = {"title": title, "content": content, "category": category}
+        self.documents[doc_id] = doc
+
+        tokens = tokenize(f"{title} {category} {content}")
+        term_freqs: Dict[str, int] = defaultdict(int)
+        for token in tokens:
+            term_freqs[token] += 1
+
+        for term, freq in term_freqs.items():
+            if term not in self.postings:
+                for gram in trigrams(term):
+                    self.trigram_index[gram].add(term)
+            self.postings[term][doc_id] = freq
+
+        self.doc_terms[doc_id] = list(term_freqs)
+        self.doc_lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+        self._norms = {}
+
+    def remove_document(self, doc_id: str) -> None:
+        """Drop a document from the index"""
+        if doc_id not in self.doc_lengths:
+            return
+
+        for term in self.doc_terms.pop(doc_id):
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+                for gram in trigrams(term):
+                    self.trigram_index[gram].discard(term)
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        self._norms = {}
+        del self.fields[doc_id]
+        del self.documents[doc_id]
+
+    def expand_term(self, term: str) -> Dict[str, float]:
+        """Map a query term to indexed terms weighted by trigram overlap"""
+        if term in self.postings:
+            return {term: 1.0}
+
+        query_grams = trigrams(term)
+        overlap: Dict[str, int] = defaultdict(int)
+        for gram in query_grams:
+            for candidate in self.trigram_index.get(gram, ()):
+                overlap[candidate] += 1
+
+        expansions = {}
+        for candidate, shared in overlap.items():
+            weight = shared / len(query_grams)
+            if weight >= self.min_trigram_overlap:
+                expansions[candidate] = weight
+        return expansions
+
+    def length_norms(self) -> Dict[str, float]:
+        """BM25 length normalisation per document, cached until the corpus changes"""
+        if not self._norms and self.doc_lengths:
+            avg_length = self.total_length / len(self.doc_lengths)
+            self._norms = {
+                doc_id: self.k1 * (1 - self.b + self.b * length / avg_length)
+                for doc_id, length in self.doc_lengths.items()
+            }
+        return self._norms
+
+    def shortlist(self, query: str, limit: int) -> List[Tuple[str, float]]:
+        """Return up to `limit` (doc_id, bm25_score) candidates for the query"""
+        num_docs = len(self.doc_lengths)
+        if not num_docs:
+            return []
+
+        norms = self.length_norms()
+        scores: Dict[str, float] = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            for indexed_term, weight in self.expand_term(term).items():
+                postings = self.postings[indexed_term]
+                idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                term_weight = weight * idf * (self.k1 + 1)
+                for doc_id, freq in postings.items():
+                    scores[doc_id] += term_weight * freq / (freq + norms[doc_id])
+
+        return heapq.nlargest(limit, scores.items(), key=lambda x: x[1])
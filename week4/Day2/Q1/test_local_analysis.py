@@ -0,0 +1,29 @@
+import unittest
+
+from local_analysis import LocalAnalysisEngine
+
+
+class KeywordTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = LocalAnalysisEngine()
+        self.engine.build([
+            {"id": "d1", "content": "Machine learning models improve healthcare outcomes"},
+            {"id": "d2", "content": "Quantum computing research is making steady progress"},
+        ])
+
+    def test_out_of_corpus_text_has_keywords(self):
+        vocabulary_size = len(self.engine.vocabulary)
+        result = self.engine.keywords("Quantum chromodynamics describes gluons and quarks binding hadrons")
+        self.assertIn("chromodynamics", result["keywords"])
+        self.assertIn("quantum", result["keywords"])
+        self.assertNotIn("and", result["keywords"])
+        self.assertEqual(len(self.engine.vocabulary), vocabulary_size)
+
+    def test_unseen_terms_outrank_corpus_terms(self):
+        results = self.engine.bulk_keywords(["gluons gluons machine", ""])
+        self.assertEqual(results[0]["keywords"], ["gluons", "machine"])
+        self.assertEqual(results[1]["keywords"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
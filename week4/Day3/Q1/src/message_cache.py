@@ -0,0 +1,228 @@
+"""
+Local Discord message cache
+SQLite FTS5 index of channel messages, filled from gateway events plus
+incremental history backfill, so searches don't refetch over the network
+"""
+
+import os
+import sqlite3
+from typing import Dict, List, Optional, Any, NamedTuple
+
+
+class Snowflake(NamedTuple):
+    """Minimal stand-in for discord.abc.Snowflake, used for history(after=/before=)"""
+    id: int
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL,
+    author_id TEXT,
+    author_name TEXT,
+    author_username TEXT,
+    content TEXT NOT NULL,
+    created_at TEXT,
+    jump_url TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_messages_channel ON messages(channel_id, id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content, content='messages', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+CREATE TABLE IF NOT EXISTS channel_state (
+    channel_id INTEGER PRIMARY KEY,
+    newest_id INTEGER,
+    oldest_id INTEGER,
+    history_exhausted INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def fts_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 phrase query with prefix matching on the last word"""
+    words = [word.replace('"', '') for word in query.split()]
+    words = [word for word in words if word]
+    if not words:
+        return None
+    return '"' + ' '.join(words) + '" *'
+
+
+class MessageCache:
+    """
+    Per-channel message cache backed by SQLite FTS5.
+
+    `add_message` is called from gateway events, and `sync_channel` fills
+    gaps through the channel history API: only messages newer than the
+    newest cached ID, plus older history when a larger window is requested.
+    Channels synced while the gateway is connected are marked live, and
+    live channels need no history calls at all until the next disconnect.
+    The cached ID range only covers messages known to be contiguous, so
+    gateway events for channels that are not live never move it past a gap.
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.live_channels = set()
+
+    def _row_from_message(self, message) -> tuple:
+        return (
+            message.id,
+            message.channel.id,
+            str(message.author.id),
+            message.author.display_name,
+            message.author.name,
+            message.content or "",
+            message.created_at.isoformat(),
+            message.jump_url
+        )
+
+    def _store(self, messages: List[Any], widen_range: bool = True) -> None:
+        """Upsert messages and, if `widen_range`, widen the channel's cached ID range"""
+        if not messages:
+            return
+
+        with self.conn:
+            self.conn.executemany(
+                """INSERT INTO messages (id, channel_id, author_id, author_name, author_username,
+                                         content, created_at, jump_url)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET content = excluded.content""",
+                [self._row_from_message(message) for message in messages]
+            )
+            if not widen_range:
+                return
+            channel_id = messages[0].channel.id
+            ids = [message.id for message in messages]
+            self.conn.execute(
+                """INSERT INTO channel_state (channel_id, newest_id, oldest_id) VALUES (?, ?, ?)
+                   ON CONFLICT(channel_id) DO UPDATE SET
+                       newest_id = MAX(COALESCE(newest_id, 0), excluded.newest_id),
+                       oldest_id = MIN(COALESCE(oldest_id, excluded.oldest_id), excluded.oldest_id)""",
+                (channel_id, max(ids), min(ids))
+            )
+
+    def add_message(self, message) -> None:
+        """Cache a message received (or edited) over the gateway"""
+        # Messages may have been missed before this one unless the channel is live
+        self._store([message], widen_range=message.channel.id in self.live_channels)
+
+    def delete_message(self, message_id: int) -> None:
+        """Remove a deleted message from the cache"""
+        with self.conn:
+            self.conn.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+
+    def channel_state(self, channel_id: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT * FROM channel_state WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def cached_count(self, channel_id: int) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM messages WHERE channel_id = ?", (channel_id,)
+        ).fetchone()[0]
+
+    async def sync_channel(self, channel, history_limit: int = 1000) -> int:
+        """
+        Bring a channel's cache up to date and up to `history_limit` messages deep
+
+        Returns:
+            Number of messages fetched from the Discord API
+        """
+        fetched = 0
+        state = self.channel_state(channel.id)
+
+        if state is None or state["newest_id"] is None:
+            batch = [message async for message in channel.history(limit=history_limit)]
+            self._store(batch)
+            fetched += len(batch)
+            if len(batch) < history_limit:
+                self._mark_exhausted(channel.id)
+            self.live_channels.add(channel.id)
+            return fetched
+
+        # Newer messages we missed while not live
+        if channel.id not in self.live_channels:
+            batch = [
+                message async for message in
+                channel.history(limit=None, after=Snowflake(state["newest_id"]), oldest_first=True)
+            ]
+            self._store(batch)
+            fetched += len(batch)
+            self.live_channels.add(channel.id)
+
+        # Older history when a wider window than cached is requested
+        missing = history_limit - self.cached_count(channel.id)
+        if missing > 0 and not state["history_exhausted"]:
+            batch = [
+                message async for message in
+                channel.history(limit=missing, before=Snowflake(state["oldest_id"]))
+            ]
+            self._store(batch)
+            fetched += len(batch)
+            if len(batch) < missing:
+                self._mark_exhausted(channel.id)
+
+        return fetched
+
+    def _mark_exhausted(self, channel_id: int) -> None:
+        with self.conn:
+            self.conn.execute(
+                """INSERT INTO channel_state (channel_id, history_exhausted) VALUES (?, 1)
+                   ON CONFLICT(channel_id) DO UPDATE SET history_exhausted = 1""",
+                (channel_id,)
+            )
+
+    def mark_disconnected(self) -> None:
+        """Forget live status; gateway events may have been missed"""
+        self.live_channels.clear()
+
+    def search(self, channel_id: int, query: str, window: int = 1000,
+               max_results: int = 50) -> List[Dict[str, Any]]:
+        """Full-text search over a channel's newest `window` cached messages, newest first"""
+        match = fts_query(query)
+        if match is None:
+            return []
+
+        # Lowest message ID inside the requested window
+        floor = self.conn.execute(
+            "SELECT id FROM messages WHERE channel_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (channel_id, max(window, 1) - 1)
+        ).fetchone()
+
+        rows = self.conn.execute(
+            """SELECT m.* FROM messages_fts
+               JOIN messages m ON m.id = messages_fts.rowid
+               WHERE messages_fts MATCH ? AND m.channel_id = ? AND m.id >= ?
+               ORDER BY m.id DESC
+               LIMIT ?""",
+            (match, channel_id, floor[0] if floor else 0, max_results)
+        ).fetchall()
+
+        return [{
+            "id": str(row["id"]),
+            "author": {
+                "id": row["author_id"],
+                "name": row["author_name"],
+                "username": row["author_username"]
+            },
+            "content": row["content"],
+            "timestamp": row["created_at"],
+            "url": row["jump_url"]
+        } for row in rows]
@@ -0,0 +1,84 @@
+"""
+Runtime metrics for the Discord MCP server
+Per-tool call latency and gateway connection counters, exposed through
+the health resource
+"""
+
+import functools
+import time
+from collections import deque
+from typing import Any, Callable, Dict
+
+
+class LatencyStats:
+    """Call count, errors and latency percentiles over a recent window"""
+
+    def __init__(self, window: int = 500):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        self.count += 1
+        self.errors += int(failed)
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.recent)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+        return {
+            "calls": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(pct(0.50), 2),
+            "p95_ms": round(pct(0.95), 2),
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0
+        }
+
+
+class ServerMetrics:
+    """Gateway connection counters and per-tool latency"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.connects = 0
+        self.reconnects = 0
+        self.resumes = 0
+        self.disconnects = 0
+        self.tools: Dict[str, LatencyStats] = {}
+
+    def timed(self, fn: Callable) -> Callable:
+        """Decorator recording the latency of an async tool; tool results with success=False count as errors"""
+        stats = self.tools.setdefault(fn.__name__, LatencyStats())
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = await fn(*args, **kwargs)
+                failed = isinstance(result, dict) and result.get("success") is False
+                return result
+            finally:
+                stats.record(time.perf_counter() - start, failed)
+
+        return wrapper
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "gateway": {
+                "connects": self.connects,
+                "reconnects": self.reconnects,
+                "resumes": self.resumes,
+                "disconnects": self.disconnects
+            },
+            "tools": {name: stats.summary() for name, stats in self.tools.items()}
+        }
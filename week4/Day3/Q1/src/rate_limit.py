@@ -0,0 +1,93 @@
+"""
+Client-side Discord rate-limit scheduler
+Throttles REST calls per route bucket (route + major parameter, e.g. the
+channel ID) before they reach Discord, so bulk operations queue locally
+instead of triggering 429 storms
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Route -> (requests, per seconds), matching Discord's documented per-channel buckets
+DEFAULT_ROUTE_LIMITS = {
+    "send_message": (5, 5.0),
+    "delete_message": (5, 1.0),
+    "bulk_delete": (1, 1.0),
+}
+GLOBAL_LIMIT = (50, 1.0)
+
+
+class RouteBucket:
+    """Sliding-window limiter for one route bucket, pausable after a 429"""
+
+    def __init__(self, limit: int, period: float):
+        self.limit = limit
+        self.period = period
+        self.calls = deque()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                while self.calls and now - self.calls[0] >= self.period:
+                    self.calls.popleft()
+                if len(self.calls) < self.limit:
+                    self.calls.append(now)
+                    return
+                await asyncio.sleep(self.period - (now - self.calls[0]))
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RateLimitScheduler:
+    """
+    Runs Discord API calls through per-route buckets plus a global bucket.
+
+    A 429 response pauses the offending bucket for its Retry-After and the
+    call is retried, so a burst of moderation actions drains at the allowed
+    rate rather than hammering the API.
+    """
+
+    def __init__(self, route_limits: Optional[Dict[str, Tuple[int, float]]] = None,
+                 global_limit: Tuple[int, float] = GLOBAL_LIMIT, max_retries: int = 3):
+        self.route_limits = {**DEFAULT_ROUTE_LIMITS, **(route_limits or {})}
+        self.global_bucket = RouteBucket(*global_limit)
+        self.buckets: Dict[Tuple[str, int], RouteBucket] = {}
+        self.max_retries = max_retries
+
+    def bucket(self, route: str, major_id: int) -> RouteBucket:
+        key = (route, major_id)
+        if key not in self.buckets:
+            self.buckets[key] = RouteBucket(*self.route_limits.get(route, GLOBAL_LIMIT))
+        return self.buckets[key]
+
+    async def run(self, route: str, major_id: int, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `call()` once its route bucket allows it, retrying on 429"""
+        bucket = self.bucket(route, major_id)
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            await self.global_bucket.acquire()
+            try:
+                return await call()
+            except Exception as e:
+                if getattr(e, "status", None) != 429 or attempt == self.max_retries:
+                    raise
+                bucket.pause(retry_after(e))
+
+
+def retry_after(error: Exception) -> float:
+    """Seconds to wait from a 429 error's Retry-After header (default 1s)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", 1.0))
+    except (TypeError, ValueError):
+        return 1.0
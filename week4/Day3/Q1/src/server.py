@@ -3,24 +3,58 @@ Discord MCP Server
 Enable AI models to interact with Discord servers
 """
 
+import math
 import os
+import sys
 import asyncio
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 from fastmcp import FastMCP
+from .message_cache import MessageCache
+from .rate_limit import RateLimitScheduler
+from .metrics import ServerMetrics
+
+# Discord rejects bulk deletes of messages older than 14 days
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+BULK_DELETE_BATCH = 100
+MAX_MESSAGE_LENGTH = 2000
 
 # Load environment variables
 load_dotenv()
 
-mcp = FastMCP("Discord MCP Server")
+@asynccontextmanager
+async def lifespan(server):
+    """Connect the bot alongside the MCP server instead of on the first tool call"""
+    await discord_client.start_bot()
+    try:
+        yield
+    finally:
+        await discord_client.close_bot()
+
+mcp = FastMCP("Discord MCP Server", lifespan=lifespan)
+metrics = ServerMetrics()
 
 class DiscordMCP:
-    def __init__(self):
+    def __init__(self, cache_path: Optional[str] = None):
         self.bot = None
+        self.bot_task = None
         self.is_connected = False
+        self.ready_event = asyncio.Event()
+        self.ready_timeout = float(os.getenv('DISCORD_READY_TIMEOUT', '30'))
+        if cache_path is None:
+            cache_path = os.getenv(
+                'DISCORD_CACHE_DB',
+                os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'message_cache.db')
+            )
+        self.message_cache = MessageCache(cache_path)
+        self.scheduler = RateLimitScheduler()
+        self.send_queues: Dict[int, List[str]] = {}
+        self.flush_tasks: Dict[int, asyncio.Task] = {}
+        self.coalesce_window = float(os.getenv('DISCORD_COALESCE_WINDOW', '0.5'))
         self.setup_discord_bot()
     
     def setup_discord_bot(self):
@@ -40,33 +74,60 @@ class DiscordMCP:
         
         @self.bot.event
         async def on_ready():
-            print(f'{self.bot.user} has connected to Discord!')
-            print(f'Bot is in {len(self.bot.guilds)} servers')
+            # stderr, since stdout carries the MCP stdio transport
+            print(f'{self.bot.user} has connected to Discord!', file=sys.stderr)
+            print(f'Bot is in {len(self.bot.guilds)} servers', file=sys.stderr)
             for guild in self.bot.guilds:
-                print(f'  - {guild.name} (ID: {guild.id})')
+                print(f'  - {guild.name} (ID: {guild.id})', file=sys.stderr)
+            if metrics.connects:
+                metrics.reconnects += 1
+            metrics.connects += 1
+            self.is_connected = True
+            self.ready_event.set()
+        
+        @self.bot.event
+        async def on_resumed():
+            metrics.resumes += 1
             self.is_connected = True
+            self.ready_event.set()
+        
+        # Keep the local message cache current from gateway events
+        @self.bot.event
+        async def on_message(message):
+            self.message_cache.add_message(message)
+        
+        @self.bot.event
+        async def on_message_edit(before, after):
+            self.message_cache.add_message(after)
+        
+        @self.bot.event
+        async def on_raw_message_delete(payload):
+            self.message_cache.delete_message(payload.message_id)
+        
+        @self.bot.event
+        async def on_raw_bulk_message_delete(payload):
+            for message_id in payload.message_ids:
+                self.message_cache.delete_message(message_id)
+        
+        @self.bot.event
+        async def on_disconnect():
+            # Events may be missed until we reconnect, so resync on next search
+            self.message_cache.mark_disconnected()
+            metrics.disconnects += 1
+            self.is_connected = False
+            self.ready_event.clear()
     
     async def start_bot(self):
-        """Start the Discord bot with proper connection"""
-        if not self.bot or self.is_connected:
+        """Start the Discord bot in the background without waiting for it to connect"""
+        if not self.bot or self.bot_task is not None:
             return {"success": True, "data": None}
         
         try:
             token = os.getenv('DISCORD_BOT_TOKEN')
-            print("Connecting Discord bot...")
-            
-            # Start the bot in background
-            bot_task = asyncio.create_task(self.bot.start(token))
-            
-            # Wait for bot to be ready (with timeout)
-            for i in range(30):  # Wait up to 30 seconds
-                if self.bot.is_ready():
-                    print("Bot connected and ready!")
-                    break
-                await asyncio.sleep(1)
-                if i == 29:
-                    raise TimeoutError("Bot didn't connect within 30 seconds")
+            print("Connecting Discord bot...", file=sys.stderr)
             
+            # on_ready sets ready_event once the gateway session is up
+            self.bot_task = asyncio.create_task(self.bot.start(token))
             return {"success": True, "data": None}
             
         except Exception as e:
@@ -77,13 +138,40 @@ class DiscordMCP:
         if not self.bot:
             return {"success": False, "error": "Discord bot not configured", "data": None}
         
-        if not self.bot.is_ready():
-            # Try to start the bot if not ready
-            start_result = await self.start_bot()
-            if not start_result["success"]:
-                return start_result
+        if self.ready_event.is_set():
+            return {"success": True, "data": None}
+        
+        # Fallback for when the server was started without its lifespan
+        start_result = await self.start_bot()
+        if not start_result["success"]:
+            return start_result
         
-        return {"success": True, "data": None}
+        # Wake on readiness, or early if the bot task dies (e.g. bad token)
+        ready_wait = asyncio.ensure_future(self.ready_event.wait())
+        await asyncio.wait({ready_wait, self.bot_task}, timeout=self.ready_timeout,
+                           return_when=asyncio.FIRST_COMPLETED)
+        ready_wait.cancel()
+        
+        if self.ready_event.is_set():
+            return {"success": True, "data": None}
+        if self.bot_task.done():
+            error = self.bot_task.exception() if not self.bot_task.cancelled() else "cancelled"
+            self.bot_task = None
+            return {"success": False, "error": f"Failed to start bot: {error}", "data": None}
+        return {"success": False, "error": f"Bot didn't connect within {self.ready_timeout:.0f} seconds", "data": None}
+    
+    def health(self) -> Dict[str, Any]:
+        """Connection state, gateway latency and per-tool latency metrics"""
+        # discord.py reports NaN latency until the first heartbeat ack
+        latency = self.bot.latency if self.bot else float('nan')
+        return {
+            "configured": self.bot is not None,
+            "ready": self.ready_event.is_set(),
+            "gateway_latency_ms": None if math.isnan(latency) else round(latency * 1000, 2),
+            "guilds": len(self.bot.guilds) if self.bot and self.ready_event.is_set() else 0,
+            "cached_channels": len(self.message_cache.live_channels),
+            **metrics.snapshot()
+        }
     
     async def send_message(self, channel_id: str, message: str) -> Dict[str, Any]:
         """Send message to Discord channel"""
@@ -100,7 +188,7 @@ class DiscordMCP:
                     "data": None
                 }
             
-            sent_message = await channel.send(message)
+            sent_message = await self.scheduler.run("send_message", channel.id, lambda: channel.send(message))
             
             return {
                 "success": True,
@@ -208,8 +296,9 @@ class DiscordMCP:
                 "data": None
             }
     
-    async def search_messages(self, channel_id: str, query: str, limit: int = 50) -> Dict[str, Any]:
-        """Search messages in Discord channel"""
+    async def search_messages(self, channel_id: str, query: str, limit: int = 50,
+                              max_results: int = 50) -> Dict[str, Any]:
+        """Search the newest `limit` messages in a Discord channel via the local index"""
         try:
             ready_check = await self.ensure_bot_ready()
             if not ready_check["success"]:
@@ -223,23 +312,10 @@ class DiscordMCP:
                     "data": None
                 }
             
-            matching_messages = []
-            search_count = 0
-            
-            async for message in channel.history(limit=limit):
-                search_count += 1
-                if query.lower() in message.content.lower():
-                    matching_messages.append({
-                        "id": str(message.id),
-                        "author": {
-                            "id": str(message.author.id),
-                            "name": message.author.display_name,
-                            "username": message.author.name
-                        },
-                        "content": message.content,
-                        "timestamp": message.created_at.isoformat(),
-                        "url": message.jump_url
-                    })
+            # Only fetches messages the cache hasn't seen yet
+            fetched = await self.message_cache.sync_channel(channel, history_limit=limit)
+            matching_messages = self.message_cache.search(channel.id, query, window=limit, max_results=max_results)
+            search_count = min(limit, self.message_cache.cached_count(channel.id))
             
             return {
                 "success": True,
@@ -247,6 +323,7 @@ class DiscordMCP:
                 "data": {
                     "query": query,
                     "searched_messages": search_count,
+                    "fetched_messages": fetched,
                     "matches": matching_messages
                 }
             }
@@ -275,8 +352,9 @@ class DiscordMCP:
             
             if action == "delete":
                 try:
-                    message = await channel.fetch_message(int(message_id))
-                    await message.delete()
+                    # Partial message avoids a fetch round-trip before deleting
+                    message = channel.get_partial_message(int(message_id))
+                    await self.scheduler.run("delete_message", channel.id, message.delete)
                     
                     return {
                         "success": True,
@@ -313,41 +391,230 @@ class DiscordMCP:
                 "data": None
             }
     
+    async def resolve_channel(self, channel_id: str):
+        """Check readiness and look up a channel once; returns (channel, error_result)"""
+        ready_check = await self.ensure_bot_ready()
+        if not ready_check["success"]:
+            return None, ready_check
+        
+        channel = self.bot.get_channel(int(channel_id))
+        if not channel:
+            return None, {
+                "success": False,
+                "error": f"Channel {channel_id} not found or bot doesn't have access",
+                "data": None
+            }
+        return channel, None
+    
+    async def bulk_delete_messages(self, channel_id: str, message_ids: List[str]) -> Dict[str, Any]:
+        """Delete many messages, using Discord's bulk-delete endpoint where eligible"""
+        try:
+            channel, error = await self.resolve_channel(channel_id)
+            if error:
+                return error
+            
+            ids = list(dict.fromkeys(int(message_id) for message_id in message_ids))
+            cutoff = datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE
+            recent = [i for i in ids if discord.utils.snowflake_time(i) > cutoff]
+            old = [i for i in ids if discord.utils.snowflake_time(i) <= cutoff]
+            
+            deleted, failed = [], []
+            
+            for start in range(0, len(recent), BULK_DELETE_BATCH):
+                batch = recent[start:start + BULK_DELETE_BATCH]
+                if len(batch) == 1:
+                    # The bulk endpoint needs at least two messages
+                    old.extend(batch)
+                    continue
+                try:
+                    await self.scheduler.run(
+                        "bulk_delete", channel.id,
+                        lambda batch=batch: channel.delete_messages([discord.Object(id=i) for i in batch])
+                    )
+                    deleted.extend(batch)
+                except discord.HTTPException as e:
+                    failed.extend({"message_id": str(i), "error": str(e)} for i in batch)
+            
+            async def delete_one(message_id: int):
+                try:
+                    await self.scheduler.run(
+                        "delete_message", channel.id, channel.get_partial_message(message_id).delete
+                    )
+                    deleted.append(message_id)
+                except discord.NotFound:
+                    failed.append({"message_id": str(message_id), "error": "Message not found"})
+                except discord.HTTPException as e:
+                    failed.append({"message_id": str(message_id), "error": str(e)})
+            
+            # Individual deletes queue on the scheduler's per-channel bucket
+            await asyncio.gather(*(delete_one(message_id) for message_id in old))
+            
+            for message_id in deleted:
+                self.message_cache.delete_message(message_id)
+            
+            return {
+                "success": not failed,
+                "message": f"Deleted {len(deleted)} of {len(ids)} messages",
+                "data": {
+                    "action": "bulk_delete",
+                    "channel_id": channel_id,
+                    "deleted": [str(i) for i in deleted],
+                    "failed": failed
+                }
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to bulk delete messages: {str(e)}",
+                "data": None
+            }
+    
+    def coalesce_messages(self, messages: List[str]) -> List[str]:
+        """Join messages with newlines into as few Discord-sized messages as possible"""
+        batches, current = [], ""
+        for message in messages:
+            # Messages longer than the limit are split on their own
+            pieces = [message[i:i + MAX_MESSAGE_LENGTH] for i in range(0, len(message), MAX_MESSAGE_LENGTH)] or [""]
+            for piece in pieces:
+                candidate = f"{current}\n{piece}" if current else piece
+                if len(candidate) <= MAX_MESSAGE_LENGTH:
+                    current = candidate
+                else:
+                    batches.append(current)
+                    current = piece
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def send_messages(self, channel_id: str, messages: List[str]) -> Dict[str, Any]:
+        """Send several messages to a channel, coalesced and rate limited"""
+        try:
+            channel, error = await self.resolve_channel(channel_id)
+            if error:
+                return error
+            
+            sent = []
+            for content in self.coalesce_messages(messages):
+                sent_message = await self.scheduler.run(
+                    "send_message", channel.id, lambda content=content: channel.send(content)
+                )
+                sent.append({
+                    "message_id": str(sent_message.id),
+                    "timestamp": sent_message.created_at.isoformat()
+                })
+            
+            return {
+                "success": True,
+                "message": f"Sent {len(messages)} messages as {len(sent)} Discord messages",
+                "data": {
+                    "channel_id": channel_id,
+                    "sent": sent
+                }
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to send messages: {str(e)}",
+                "data": None
+            }
+    
+    async def queue_message(self, channel_id: str, message: str) -> Dict[str, Any]:
+        """Queue a message; queued messages per channel are flushed together after a short window"""
+        key = int(channel_id)
+        queue = self.send_queues.setdefault(key, [])
+        queue.append(message)
+        
+        if key not in self.flush_tasks or self.flush_tasks[key].done():
+            self.flush_tasks[key] = asyncio.create_task(self._flush_queue(key))
+        
+        return {
+            "success": True,
+            "message": "Message queued",
+            "data": {
+                "channel_id": channel_id,
+                "queued": len(queue)
+            }
+        }
+    
+    async def _flush_queue(self, channel_key: int) -> None:
+        """Wait for the coalescing window, then send everything queued for a channel"""
+        # Keep going until the queue stays empty: messages queued while a send is
+        # in flight don't start a new task, since this one is not done yet
+        while self.send_queues.get(channel_key):
+            await asyncio.sleep(self.coalesce_window)
+            messages = self.send_queues.pop(channel_key, [])
+            result = await self.send_messages(str(channel_key), messages)
+            if not result["success"]:
+                # stdout carries the MCP stdio transport
+                print(f"Failed to flush queued messages for {channel_key}: {result['error']}", file=sys.stderr)
+    
     async def close_bot(self):
         """Close the Discord bot connection"""
         if self.bot and not self.bot.is_closed():
             await self.bot.close()
             self.is_connected = False
+            self.ready_event.clear()
+        self.bot_task = None
 
 # Initialize the Discord MCP client
 discord_client = DiscordMCP()
 
 # MCP Tool definitions
 @mcp.tool()
+@metrics.timed
 async def send_message_tool(channel_id: str, message: str) -> Dict[str, Any]:
     """Send message to Discord channel"""
     return await discord_client.send_message(channel_id, message)
 
 @mcp.tool()
+@metrics.timed
 async def get_messages_tool(channel_id: str, limit: int = 10) -> Dict[str, Any]:
     """Get recent messages from Discord channel"""
     return await discord_client.get_messages(channel_id, limit)
 
 @mcp.tool()
+@metrics.timed
 async def get_channel_info_tool(channel_id: str) -> Dict[str, Any]:
     """Get Discord channel information and metadata"""
     return await discord_client.get_channel_info(channel_id)
 
 @mcp.tool()
-async def search_messages_tool(channel_id: str, query: str, limit: int = 50) -> Dict[str, Any]:
-    """Search messages in Discord channel with filters"""
-    return await discord_client.search_messages(channel_id, query, limit)
+@metrics.timed
+async def search_messages_tool(channel_id: str, query: str, limit: int = 50, max_results: int = 50) -> Dict[str, Any]:
+    """Search the last `limit` messages in a Discord channel (served from a local full-text index)"""
+    return await discord_client.search_messages(channel_id, query, limit, max_results)
 
 @mcp.tool()
+@metrics.timed
 async def moderate_content_tool(channel_id: str, message_id: str, action: str = "delete") -> Dict[str, Any]:
     """Moderate Discord content - delete messages"""
     return await discord_client.moderate_content(channel_id, message_id, action)
 
+@mcp.tool()
+@metrics.timed
+async def bulk_delete_messages_tool(channel_id: str, message_ids: List[str]) -> Dict[str, Any]:
+    """Delete many messages at once (bulk endpoint for messages under 14 days old)"""
+    return await discord_client.bulk_delete_messages(channel_id, message_ids)
+
+@mcp.tool()
+@metrics.timed
+async def send_messages_tool(channel_id: str, messages: List[str]) -> Dict[str, Any]:
+    """Send several messages, combined into as few Discord messages as possible"""
+    return await discord_client.send_messages(channel_id, messages)
+
+@mcp.tool()
+@metrics.timed
+async def queue_message_tool(channel_id: str, message: str) -> Dict[str, Any]:
+    """Queue a message; messages queued close together are sent as one"""
+    return await discord_client.queue_message(channel_id, message)
+
+@mcp.resource("discord://health")
+def health_resource() -> Dict[str, Any]:
+    """Bot readiness, gateway latency, reconnect counts and per-tool latency"""
+    return discord_client.health()
+
 def main():
     """Main function - runs MCP server"""
     print("Discord MCP Server initialized!")
@@ -357,6 +624,9 @@ def main():
     print("3. get_channel_info_tool - Get channel metadata")
     print("4. search_messages_tool - Search messages with filters")
     print("5. moderate_content_tool - Delete messages and moderate content")
+    print("6. bulk_delete_messages_tool - Delete many messages at once")
+    print("7. send_messages_tool - Send several messages, coalesced")
+    print("8. queue_message_tool - Queue a message for coalesced sending")
     print("\nMake sure to set DISCORD_BOT_TOKEN in your .env file!")
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import asyncio
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from src.message_cache import MessageCache
+
+
+class FakeChannel:
+    """Mimics discord.TextChannel.history over an in-memory message list"""
+
+    def __init__(self, channel_id, contents):
+        self.id = channel_id
+        self.messages = []
+        self.history_calls = []
+        for content in contents:
+            self.post(content)
+
+    def post(self, content):
+        message_id = 1000 + len(self.messages)
+        message = SimpleNamespace(
+            id=message_id,
+            channel=self,
+            author=SimpleNamespace(id=7, display_name="Tester", name="tester"),
+            content=content,
+            created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            jump_url=f"https://discord.com/channels/1/{self.id}/{message_id}"
+        )
+        self.messages.append(message)
+        return message
+
+    async def history(self, limit=100, before=None, after=None, oldest_first=None):
+        self.history_calls.append({"limit": limit, "before": before, "after": after})
+        selected = [
+            m for m in self.messages
+            if (before is None or m.id < before.id) and (after is None or m.id > after.id)
+        ]
+        selected.sort(key=lambda m: m.id, reverse=not oldest_first)
+        for message in selected[:limit] if limit is not None else selected:
+            yield message
+
+
+class TestMessageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = MessageCache(":memory:")
+        self.channel = FakeChannel(42, ["hello python", "deploy failed", "python tips", "lunch?"])
+
+    def sync(self, history_limit=1000):
+        return asyncio.run(self.cache.sync_channel(self.channel, history_limit))
+
+    def test_backfill_then_search_hits_index(self):
+        """First sync backfills; repeat searches need no history calls."""
+        self.assertEqual(self.sync(), 4)
+        self.assertEqual(self.sync(), 0)
+        self.assertEqual(len(self.channel.history_calls), 1)
+
+        matches = self.cache.search(42, "python")
+        self.assertEqual([m["content"] for m in matches], ["python tips", "hello python"])
+
+    def test_prefix_and_phrase_matching(self):
+        self.sync()
+        self.assertEqual(len(self.cache.search(42, "pyth")), 2)
+        self.assertEqual([m["content"] for m in self.cache.search(42, "deploy fail")], ["deploy failed"])
+
+    def test_gateway_messages_are_indexed(self):
+        self.sync()
+        self.cache.add_message(self.channel.post("new python release"))
+        self.assertEqual(len(self.cache.search(42, "python")), 3)
+        self.assertEqual(self.sync(), 0)
+
+    def test_only_newer_messages_fetched_after_disconnect(self):
+        self.sync()
+        self.cache.mark_disconnected()
+        self.channel.post("python missed while offline")
+
+        self.assertEqual(self.sync(), 1)
+        self.assertEqual(self.channel.history_calls[-1]["after"].id, 1003)
+        self.assertEqual(len(self.cache.search(42, "python")), 3)
+
+    def test_gateway_message_after_disconnect_does_not_skip_gap(self):
+        self.sync()
+        self.cache.mark_disconnected()
+        self.channel.post("python missed while offline")
+        self.cache.add_message(self.channel.post("python after reconnect"))
+
+        self.sync()
+        self.assertEqual(self.channel.history_calls[-1]["after"].id, 1003)
+        self.assertEqual([m["content"] for m in self.cache.search(42, "python missed")],
+                         ["python missed while offline"])
+        self.assertEqual(len(self.cache.search(42, "python")), 4)
+
+    def test_wider_window_backfills_older_history(self):
+        self.assertEqual(self.sync(history_limit=2), 2)
+        self.assertEqual(self.cache.search(42, "hello", window=2), [])
+
+        self.assertEqual(self.sync(history_limit=10), 2)
+        self.assertEqual(self.channel.history_calls[-1]["before"].id, 1002)
+        self.assertEqual(len(self.cache.search(42, "hello", window=10)), 1)
+
+    def test_deleted_messages_leave_index(self):
+        self.sync()
+        self.cache.delete_message(1000)
+        self.assertEqual([m["content"] for m in self.cache.search(42, "python")], ["python tips"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,21 +22,49 @@ def analyze_texts():
         # Get similarity matrix using specified model
         similarity_matrix = plagiarism_detector.compute_similarity(texts, model_type)
         
-        # Find potential plagiarism (similarity > 80%)
-        plagiarism_pairs = []
-        for i in range(len(similarity_matrix)):
-            for j in range(i + 1, len(similarity_matrix)):
-                if similarity_matrix[i][j] > 0.8:  # 80% threshold
-                    plagiarism_pairs.append({
-                        'text1_index': i,
-                        'text2_index': j,
-                        'similarity': float(similarity_matrix[i][j])
-                    })
+        # Only flagged pairs by default; the dense O(n^2) matrix is opt-in
+        threshold = float(data.get('threshold', 0.8))
+        response = {
+            'plagiarism_detected': plagiarism_detector.flagged_pairs(similarity_matrix, threshold),
+            'threshold': threshold,
+            'model_used': model_type
+        }
+
+        top_k = int(data.get('top_k', 0))
+        if top_k > 0:
+            response['neighbours'] = plagiarism_detector.top_neighbours(similarity_matrix, top_k)
+
+        if data.get('include_matrix', False):
+            response['similarity_matrix'] = plagiarism_detector.encode_matrix(
+                similarity_matrix, data.get('matrix_format', 'json')
+            )
+
+        # Every analyzed submission is checked against and added to the archive
+        if data.get('archive', True):
+            response['archive_matches'] = plagiarism_detector.check_archive(texts, data.get('labels'))
+
+        return jsonify(response)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
+@app.route('/archive/check', methods=['POST'])
+def check_archive():
+    try:
+        data = request.get_json()
+        texts = data.get('texts', [])
+
+        if not texts:
+            return jsonify({'error': 'At least one text is required'}), 400
+
+        results = plagiarism_detector.check_archive(
+            texts,
+            data.get('labels'),
+            store=data.get('store', False),
+            max_results=int(data.get('max_results', 10))
+        )
         return jsonify({
-            'similarity_matrix': similarity_matrix.tolist(),
-            'plagiarism_detected': plagiarism_pairs,
-            'model_used': model_type
+            'results': results,
+            'archive_size': plagiarism_detector.archive.count()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
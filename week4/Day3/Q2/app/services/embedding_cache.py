@@ -0,0 +1,52 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent store of L2-normalized float32 embeddings keyed by (model, text hash)"""
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                       model TEXT NOT NULL,
+                       text_hash TEXT NOT NULL,
+                       vector BLOB NOT NULL,
+                       PRIMARY KEY (model, text_hash)
+                   )"""
+            )
+
+    def get_many(self, model: str, hashes: list) -> dict:
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self.lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk]
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, items: dict) -> None:
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(model, key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()]
+            )
@@ -1,16 +1,42 @@
+import base64
+import io
 import numpy as np
 from difflib import SequenceMatcher
 import os
+import re
+from scipy import sparse
 from openai import OpenAI
 from dotenv import load_dotenv
+from services.embedding_cache import EmbeddingCache, text_hash
+from services.submission_archive import SubmissionArchive
 
 load_dotenv()
 
+SHINGLE_SIZE = 5
+HASH_FEATURES = 1 << 20
+# TF-IDF cosine above which a pair is re-scored exactly with SequenceMatcher
+CANDIDATE_THRESHOLD = 0.5
+
+OPENAI_EMBEDDING_MODEL = "text-embedding-ada-002"
+OPENAI_BATCH_SIZE = 256
+SENTENCE_TRANSFORMER_MODEL = os.getenv("SENTENCE_TRANSFORMER_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "embedding_cache.sqlite")
+)
+ARCHIVE_PATH = os.getenv(
+    "SUBMISSION_ARCHIVE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "submission_archive.sqlite")
+)
+
 class PlagiarismDetector:
     def __init__(self):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         if self.openai_api_key:
             self.openai_client = OpenAI(api_key=self.openai_api_key)
+        self.embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH)
+        self._sentence_model = None
+        self.archive = SubmissionArchive(ARCHIVE_PATH)
 
     def compute_similarity(self, texts: list, model_type: str = "difflib"):
         if not texts or len(texts) < 2:
@@ -18,41 +44,183 @@ class PlagiarismDetector:
 
         if model_type == "difflib":
             return self._compute_similarity_difflib(texts)
+        elif model_type == "tfidf":
+            return self._compute_similarity_tfidf(texts)
         elif model_type == "openai":
             return self._compute_similarity_openai(texts)
+        elif model_type == "sentence-transformers":
+            return self._compute_similarity_sentence_transformers(texts)
         else:
             raise ValueError(f"Unsupported model type: {model_type}")
 
+    def flagged_pairs(self, similarity_matrix, threshold: float = 0.8):
+        """Pairs above threshold from the strict upper triangle, most similar first"""
+        rows, cols = np.triu_indices(len(similarity_matrix), k=1)
+        scores = similarity_matrix[rows, cols]
+        mask = scores > threshold
+        rows, cols, scores = rows[mask], cols[mask], scores[mask]
+        order = np.argsort(-scores, kind="stable")
+        return [
+            {'text1_index': int(i), 'text2_index': int(j), 'similarity': float(score)}
+            for i, j, score in zip(rows[order], cols[order], scores[order])
+        ]
+
+    def top_neighbours(self, similarity_matrix, k: int):
+        """The k most similar other texts for every text"""
+        n = len(similarity_matrix)
+        k = max(0, min(k, n - 1))
+        if k == 0:
+            return [[] for _ in range(n)]
+        scores = np.array(similarity_matrix, dtype=np.float64, copy=True)
+        np.fill_diagonal(scores, -np.inf)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        return [
+            [{'index': int(j), 'similarity': float(score)} for j, score in zip(row, row_scores)]
+            for row, row_scores in zip(top, top_scores)
+        ]
+
+    def encode_matrix(self, similarity_matrix, matrix_format: str = "json"):
+        """Dense matrix as nested lists, or a compact float16 base64 / .npy payload"""
+        if matrix_format == "json":
+            return similarity_matrix.tolist()
+        half = np.asarray(similarity_matrix, dtype=np.float16)
+        if matrix_format == "float16":
+            return {
+                'dtype': 'float16',
+                'shape': list(half.shape),
+                'data': base64.b64encode(half.tobytes()).decode("ascii")
+            }
+        if matrix_format == "npy":
+            buffer = io.BytesIO()
+            np.save(buffer, half)
+            return {'format': 'npy', 'data': base64.b64encode(buffer.getvalue()).decode("ascii")}
+        raise ValueError(f"Unsupported matrix format: {matrix_format}")
+
+    def check_archive(self, texts: list, labels: list = None, store: bool = True, max_results: int = 10):
+        """Match each text against all previously archived submissions, then archive the texts"""
+        labels = labels or [None] * len(texts)
+        # Check everything first so texts in the same request don't match each other here
+        results = [{"matches": self.archive.check(text, max_results)} for text in texts]
+        if store:
+            for result, text, label in zip(results, texts, labels):
+                result["archive_id"] = self.archive.add(text, label)
+        return results
+
     def _compute_similarity_difflib(self, texts: list):
         n = len(texts)
-        similarity_matrix = np.zeros((n, n))
+        similarity_matrix = np.eye(n)
         
+        # Upper triangle only; the matrix is mirrored and the diagonal is 1
         for i in range(n):
-            for j in range(n):
+            for j in range(i + 1, n):
                 similarity = SequenceMatcher(None, texts[i], texts[j]).ratio()
                 similarity_matrix[i][j] = similarity
+                similarity_matrix[j][i] = similarity
         
         return similarity_matrix
 
+    def _shingle_ids(self, text: str):
+        # Rolling polynomial hash of every SHINGLE_SIZE-byte window, vectorized
+        normalized = re.sub(r"\s+", " ", text.lower()).strip().encode("utf-8")
+        data = np.frombuffer(normalized, dtype=np.uint8).astype(np.uint64)
+        if len(data) < SHINGLE_SIZE:
+            data = np.pad(data, (0, SHINGLE_SIZE - len(data)))
+        windows = len(data) - SHINGLE_SIZE + 1
+        hashes = np.zeros(windows, dtype=np.uint64)
+        for k in range(SHINGLE_SIZE):
+            hashes = hashes * np.uint64(257) + data[k:k + windows]
+        return (hashes % np.uint64(HASH_FEATURES)).astype(np.int64)
+
+    def _tfidf_matrix(self, texts: list):
+        rows, cols, counts = [], [], []
+        for row, text in enumerate(texts):
+            ids, freq = np.unique(self._shingle_ids(text), return_counts=True)
+            rows.append(np.full(len(ids), row))
+            cols.append(ids)
+            counts.append(freq)
+
+        rows, cols, counts = np.concatenate(rows), np.concatenate(cols), np.concatenate(counts)
+        doc_freq = np.bincount(cols, minlength=HASH_FEATURES)
+        idf = np.log((1 + len(texts)) / (1 + doc_freq[cols])) + 1.0
+        values = (1.0 + np.log(counts)) * idf
+
+        matrix = sparse.csr_matrix((values, (rows, cols)), shape=(len(texts), HASH_FEATURES))
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        return sparse.diags(1.0 / np.maximum(norms, 1e-12)) @ matrix
+
+    def _compute_similarity_tfidf(self, texts: list):
+        n = len(texts)
+        vectors = self._tfidf_matrix(texts)
+
+        # One sparse product for all pairs; keep the strict upper triangle
+        cosine = sparse.triu(vectors @ vectors.T, k=1).tocoo()
+        similarity_matrix = np.eye(n)
+        similarity_matrix[cosine.row, cosine.col] = cosine.data
+
+        # Exact SequenceMatcher score only for likely matches
+        for i, j, score in zip(cosine.row, cosine.col, cosine.data):
+            if score >= CANDIDATE_THRESHOLD:
+                similarity_matrix[i][j] = SequenceMatcher(None, texts[i], texts[j]).ratio()
+
+        upper = np.triu(similarity_matrix, k=1)
+        return upper + upper.T + np.eye(n)
+
+    def _cached_embeddings(self, texts: list, model_name: str, embed_batch):
+        # Embed only texts not seen before; embed_batch returns one vector per input
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.embedding_cache.get_many(model_name, hashes)
+
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        if missing:
+            new_vectors = np.asarray(embed_batch(list(missing.values())), dtype=np.float32)
+            new_vectors /= np.maximum(np.linalg.norm(new_vectors, axis=1, keepdims=True), 1e-12)
+            computed = dict(zip(missing.keys(), new_vectors))
+            self.embedding_cache.put_many(model_name, computed)
+            vectors.update(computed)
+
+        return np.stack([vectors[key] for key in hashes])
+
+    def _cosine_matrix(self, embeddings):
+        # Rows are already unit length, so cosine is a single float32 product
+        return embeddings @ embeddings.T
+
     def _compute_similarity_openai(self, texts: list):
         if not self.openai_api_key:
             raise ValueError("OpenAI API key not found")
 
-        # Generate embeddings using OpenAI
-        embeddings = []
-        for text in texts:
-            response = self.openai_client.embeddings.create(
-                input=text,
-                model="text-embedding-ada-002"
+        def embed_batch(batch_texts):
+            embeddings = []
+            for start in range(0, len(batch_texts), OPENAI_BATCH_SIZE):
+                response = self.openai_client.embeddings.create(
+                    input=batch_texts[start:start + OPENAI_BATCH_SIZE],
+                    model=OPENAI_EMBEDDING_MODEL
+                )
+                embeddings.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+            return embeddings
+
+        embeddings = self._cached_embeddings(texts, OPENAI_EMBEDDING_MODEL, embed_batch)
+        return self._cosine_matrix(embeddings)
+
+    def _compute_similarity_sentence_transformers(self, texts: list):
+        if self._sentence_model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                raise ValueError("sentence-transformers is not installed")
+            self._sentence_model = SentenceTransformer(SENTENCE_TRANSFORMER_MODEL)
+
+        def embed_batch(batch_texts):
+            return self._sentence_model.encode(
+                batch_texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True
             )
-            embeddings.append(response.data[0].embedding)
 
-        # Convert to numpy array and compute similarity
-        embeddings_array = np.array(embeddings)
-        similarity_matrix = np.dot(embeddings_array, embeddings_array.T)
-        
-        # Normalize to [0, 1] range
-        norms = np.linalg.norm(embeddings_array, axis=1)
-        similarity_matrix = similarity_matrix / np.outer(norms, norms)
-        
-        return similarity_matrix 
\ No newline at end of file
+        embeddings = self._cached_embeddings(texts, SENTENCE_TRANSFORMER_MODEL, embed_batch)
+        return self._cosine_matrix(embeddings)
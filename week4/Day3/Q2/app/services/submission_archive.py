@@ -0,0 +1,187 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+WORD_SHINGLE = 5
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+MERSENNE_PRIME = (1 << 31) - 1
+# Estimated Jaccard below which an LSH candidate is not reported
+MIN_JACCARD = 0.2
+
+_rng = np.random.RandomState(1)
+PERM_A = _rng.randint(1, MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+PERM_B = _rng.randint(0, MERSENNE_PRIME, size=NUM_PERM).astype(np.uint64)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT,
+    text_hash TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    submission_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets(band, bucket);
+"""
+
+
+def word_shingles(text: str):
+    """Hashes of every WORD_SHINGLE-word window, with the character span each covers"""
+    words = [(m.group().lower(), m.start(), m.end()) for m in re.finditer(r"\w+", text)]
+    if not words:
+        return np.zeros(0, dtype=np.uint64), []
+    size = min(WORD_SHINGLE, len(words))
+    hashes, spans = [], []
+    for i in range(len(words) - size + 1):
+        window = words[i:i + size]
+        hashes.append(zlib.crc32(" ".join(w for w, _, _ in window).encode("utf-8")))
+        spans.append((window[0][1], window[-1][2]))
+    return np.array(hashes, dtype=np.uint64), spans
+
+
+def minhash_signature(shingles) -> np.ndarray:
+    if len(shingles) == 0:
+        return np.full(NUM_PERM, MERSENNE_PRIME, dtype=np.uint64)
+    # (a * x + b) mod p for all permutations and shingles at once
+    values = (np.outer(PERM_A, np.unique(shingles) % MERSENNE_PRIME) + PERM_B[:, None]) % MERSENNE_PRIME
+    return values.min(axis=1)
+
+
+def band_buckets(signature: np.ndarray):
+    return [
+        zlib.crc32(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes())
+        for band in range(BANDS)
+    ]
+
+
+def overlapping_spans(query_hashes, query_spans, archive_hashes, archive_spans):
+    """Merge runs of consecutive shared shingles into character spans in both texts"""
+    first_position = {}
+    for position, value in enumerate(archive_hashes.tolist()):
+        first_position.setdefault(value, position)
+
+    spans = []
+    run = None
+    for i, value in enumerate(query_hashes.tolist()):
+        j = first_position.get(value)
+        if j is not None and run is not None and run[1] == i - 1 and run[3] == j - 1:
+            run[1], run[3] = i, j
+            continue
+        if run is not None:
+            spans.append(run)
+            run = None
+        if j is not None:
+            run = [i, i, j, j]
+    if run is not None:
+        spans.append(run)
+
+    return [{
+        "submission_start": query_spans[qs][0],
+        "submission_end": query_spans[qe][1],
+        "archive_start": archive_spans[as_][0],
+        "archive_end": archive_spans[ae][1]
+    } for qs, qe, as_, ae in spans]
+
+
+def candidate_query(bands: int) -> str:
+    """
+    IDs of submissions sharing any of `bands` (band, bucket) pairs.
+
+    One equality lookup per band, so SQLite searches idx_lsh_buckets for
+    each pair; a row-value IN (VALUES ...) scans the whole table instead.
+    """
+    return " UNION ".join(
+        "SELECT submission_id FROM lsh_buckets WHERE band = ? AND bucket = ?" for _ in range(bands)
+    )
+
+
+class SubmissionArchive:
+    """
+    Persistent near-duplicate index of every analyzed submission.
+
+    Each text is MinHashed over word shingles and its signature split into
+    LSH bands stored in SQLite, so checking a new submission only touches
+    archived texts sharing at least one band bucket instead of the whole
+    history.
+    """
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+
+    def add(self, text: str, label: str = None) -> int:
+        """Archive a submission, returning its archive ID (existing ID for a repeated text)"""
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT id FROM submissions WHERE text_hash = ?", (key,)).fetchone()
+            if row:
+                return row["id"]
+
+            signature = minhash_signature(word_shingles(text)[0])
+            cursor = self.conn.execute(
+                "INSERT INTO submissions (label, text_hash, text, signature, created_at) VALUES (?, ?, ?, ?, ?)",
+                (label, key, text, signature.tobytes(), time.time())
+            )
+            archive_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO lsh_buckets (band, bucket, submission_id) VALUES (?, ?, ?)",
+                [(band, bucket, archive_id) for band, bucket in enumerate(band_buckets(signature))]
+            )
+            return archive_id
+
+    def check(self, text: str, max_results: int = 10):
+        """Archived submissions similar to `text`, best first, with their overlapping spans"""
+        hashes, spans = word_shingles(text)
+        signature = minhash_signature(hashes)
+        pairs = list(enumerate(band_buckets(signature)))
+
+        with self.lock:
+            candidate_ids = [row[0] for row in self.conn.execute(
+                candidate_query(len(pairs)), [value for pair in pairs for value in pair]
+            )]
+            if not candidate_ids:
+                return []
+            rows = self.conn.execute(
+                f"SELECT id, label, text, signature FROM submissions WHERE id IN ({','.join('?' * len(candidate_ids))})",
+                candidate_ids
+            ).fetchall()
+
+        scored = []
+        for row in rows:
+            estimate = float(np.mean(np.frombuffer(row["signature"], dtype=np.uint64) == signature))
+            if estimate >= MIN_JACCARD:
+                scored.append((estimate, row))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        matches = []
+        for estimate, row in scored[:max_results]:
+            archive_hashes, archive_spans = word_shingles(row["text"])
+            matches.append({
+                "archive_id": row["id"],
+                "label": row["label"],
+                "similarity": round(estimate, 4),
+                "overlapping_spans": overlapping_spans(hashes, spans, archive_hashes, archive_spans)
+            })
+        return matches
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
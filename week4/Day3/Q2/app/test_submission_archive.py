@@ -0,0 +1,28 @@
+import unittest
+
+from services.submission_archive import BANDS, SubmissionArchive, candidate_query
+
+
+class SubmissionArchiveTests(unittest.TestCase):
+    def setUp(self):
+        self.archive = SubmissionArchive(":memory:")
+
+    def test_candidate_lookup_uses_bucket_index(self):
+        plan = self.archive.conn.execute(
+            "EXPLAIN QUERY PLAN " + candidate_query(BANDS), [0] * (2 * BANDS)
+        ).fetchall()
+        lookups = [row["detail"] for row in plan if "lsh_buckets" in row["detail"]]
+        self.assertEqual(len(lookups), BANDS)
+        for detail in lookups:
+            self.assertIn("USING INDEX idx_lsh_buckets", detail)
+            self.assertNotIn("SCAN", detail)
+
+    def test_check_finds_near_duplicate(self):
+        original = self.archive.add("the quick brown fox jumps over the lazy dog near the river bank today")
+        self.archive.add("completely different text about something else entirely and more words")
+        matches = self.archive.check("the quick brown fox jumps over the lazy dog near the river bank")
+        self.assertEqual([match["archive_id"] for match in matches], [original])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.text_chunker import CHARS, OFFSET_STRATEGIES, BoundaryIndex
+from app.token_chunker import UNITS, TokenMeasure
+
+DOCUMENT_CACHE_SIZE = int(os.getenv("CHUNK_DOCUMENT_CACHE_SIZE", "16"))
+RESULT_CACHE_SIZE = int(os.getenv("CHUNK_RESULT_CACHE_SIZE", "512"))
+HISTOGRAM_BINS = 10
+
+
+def document_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PreparedDocument:
+    """A document with its boundary index and per-unit measures, built once and shared by all strategies"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.index = BoundaryIndex(text)
+        self.measures: Dict[str, Any] = {"chars": CHARS}
+
+    def measure(self, unit: str):
+        if unit not in self.measures:
+            self.measures[unit] = TokenMeasure(self.text)
+        return self.measures[unit]
+
+
+def size_histogram(sizes: List[int], bins: int = HISTOGRAM_BINS) -> Dict[str, List[int]]:
+    if not sizes:
+        return {"bin_edges": [], "counts": []}
+    low, high = min(sizes), max(sizes)
+    width = max(1, -(-(high - low + 1) // bins))
+    counts = [0] * bins
+    for size in sizes:
+        counts[min((size - low) // width, bins - 1)] += 1
+    return {"bin_edges": [low + width * i for i in range(bins + 1)], "counts": counts}
+
+
+def strategy_stats(starts: List[int], ends: List[int], measure) -> Dict[str, Any]:
+    sizes = [measure.size(start, end) for start, end in zip(starts, ends)]
+    overlapped = sum(
+        measure.size(starts[i + 1], ends[i])
+        for i in range(len(starts) - 1)
+        if starts[i + 1] < ends[i]
+    )
+    total = sum(sizes)
+    return {
+        "chunk_count": len(sizes),
+        "average_size": total / len(sizes) if sizes else 0,
+        "min_size": min(sizes) if sizes else 0,
+        "max_size": max(sizes) if sizes else 0,
+        "size_histogram": size_histogram(sizes),
+        # Share of emitted units that repeat the previous chunk
+        "overlap_ratio": overlapped / total if total else 0.0
+    }
+
+
+class ChunkComparer:
+    """
+    Runs many strategy / size / overlap combinations over one document.
+
+    Documents are prepared once and cached by SHA-256, along with every
+    computed combination, so a client sweeping parameters can resend just
+    the document hash and only new combinations are chunked.
+    """
+
+    def __init__(self):
+        self.documents: "OrderedDict[str, PreparedDocument]" = OrderedDict()
+        self.results: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+    def prepare(self, text: Optional[str] = None, doc_hash: Optional[str] = None) -> str:
+        """Cache a document and return its hash; an already cached document can be referenced by hash alone"""
+        if text is None:
+            if doc_hash not in self.documents:
+                raise ValueError("Unknown document_hash; send the text again")
+            self.documents.move_to_end(doc_hash)
+            return doc_hash
+
+        doc_hash = document_hash(text)
+        if doc_hash not in self.documents:
+            self.documents[doc_hash] = PreparedDocument(text)
+            while len(self.documents) > DOCUMENT_CACHE_SIZE:
+                self.documents.popitem(last=False)
+        self.documents.move_to_end(doc_hash)
+        return doc_hash
+
+    def run(self, doc_hash: str, strategy: str, chunk_size: int, overlap: int, unit: str) -> Dict[str, Any]:
+        key = (doc_hash, strategy, chunk_size, overlap, unit)
+        if key in self.results:
+            self.results.move_to_end(key)
+            return self.results[key]
+
+        chunker = OFFSET_STRATEGIES.get(strategy)
+        if not chunker:
+            raise ValueError("Invalid chunking strategy")
+        if unit not in UNITS:
+            raise ValueError(f"unit must be one of {', '.join(UNITS)}")
+
+        document = self.documents[doc_hash]
+        measure = document.measure(unit)
+        starts, ends = [], []
+        for start, end in chunker(document.text, chunk_size, overlap, index=document.index, measure=measure):
+            starts.append(start)
+            ends.append(end)
+
+        result = {"starts": starts, "ends": ends, "stats": strategy_stats(starts, ends, measure)}
+        self.results[key] = result
+        while len(self.results) > RESULT_CACHE_SIZE:
+            self.results.popitem(last=False)
+        return result
+
+    def compare(self, doc_hash: str, strategies: List[str], configs: List[Dict[str, int]],
+                unit: str = "chars", include_offsets: bool = True) -> List[Dict[str, Any]]:
+        comparisons = []
+        for strategy in strategies:
+            for config in configs:
+                chunk_size = int(config.get("chunk_size", 500))
+                overlap = int(config.get("overlap", 50))
+                entry = {"strategy": strategy, "chunk_size": chunk_size, "overlap": overlap}
+                try:
+                    result = self.run(doc_hash, strategy, chunk_size, overlap, unit)
+                    entry["stats"] = result["stats"]
+                    if include_offsets:
+                        entry["starts"] = result["starts"]
+                        entry["ends"] = result["ends"]
+                except Exception as e:
+                    entry["error"] = str(e)
+                comparisons.append(entry)
+        return comparisons
@@ -1,15 +1,18 @@
+import json
 from fastapi import FastAPI, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from PyPDF2 import PdfReader
+from fastapi.responses import StreamingResponse
 from typing import List, Dict
-from app.text_chunker import (
-    fixed_size_chunker,
-    sentence_chunker,
-    paragraph_chunker,
-    sliding_window_chunker
-)
+from app.pdf_extractor import iter_pages, extract_text, file_hash, shutdown_executor
+from app.token_chunker import chunk_document, chunk_documents
+from app.chunk_compare import ChunkComparer
 
 app = FastAPI()
+chunk_comparer = ChunkComparer()
+
+@app.on_event("shutdown")
+def stop_extractor():
+    shutdown_executor()
 
 # Add CORS middleware
 app.add_middleware(
@@ -21,52 +24,116 @@ app.add_middleware(
 )
 
 @app.post("/upload")
-async def upload_pdf(file: UploadFile = File(...)):
+async def upload_pdf(file: UploadFile = File(...), stream: bool = False):
     if not file.filename.endswith('.pdf'):
         return {"error": "Only PDF files are allowed"}
     
     try:
-        # Read PDF content
+        # Read the upload once; extraction works from these bytes
         pdf_content = await file.read()
-        reader = PdfReader(file.file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
-        
-        return {"text": text}
+
+        if stream:
+            return StreamingResponse(
+                stream_pages(pdf_content),
+                media_type="application/x-ndjson"
+            )
+
+        text, page_count = await extract_text(pdf_content)
+        return {"text": text, "pages": page_count, "file_hash": file_hash(pdf_content)}
     except Exception as e:
         return {"error": str(e)}
 
+async def stream_pages(pdf_content: bytes):
+    """NDJSON lines: one per page as it is extracted, then a final summary line"""
+    page_count = 0
+    try:
+        async for page_number, text in iter_pages(pdf_content):
+            page_count = page_number
+            yield json.dumps({"page": page_number, "text": text}) + "\n"
+        yield json.dumps({"done": True, "pages": page_count, "file_hash": file_hash(pdf_content)}) + "\n"
+    except Exception as e:
+        yield json.dumps({"error": str(e)}) + "\n"
+
+def chunk_metadata(result: Dict, strategy: str, unit: str) -> Dict:
+    sizes = result["sizes"]
+    return {
+        "total_chunks": len(sizes),
+        "average_chunk_size": sum(sizes) / len(sizes) if sizes else 0,
+        "strategy": strategy,
+        "unit": unit
+    }
+
 @app.post("/chunk")
 async def chunk_text(data: Dict):
     text = data.get("text", "")
     strategy = data.get("strategy", "fixed")
     chunk_size = data.get("chunk_size", 500)
     overlap = data.get("overlap", 50)
+    # "chars" or "tokens"; token budgets match embedding model limits
+    unit = data.get("unit", "chars")
     
     if not text:
         return {"error": "No text provided"}
     
-    chunkers = {
-        "fixed": fixed_size_chunker,
-        "sentence": sentence_chunker,
-        "paragraph": paragraph_chunker,
-        "sliding": sliding_window_chunker
-    }
-    
-    chunker = chunkers.get(strategy)
-    if not chunker:
-        return {"error": "Invalid chunking strategy"}
-    
     try:
-        chunks = chunker(text, chunk_size=chunk_size, overlap=overlap)
+        result = chunk_document(text, strategy, chunk_size, overlap, unit)
         return {
-            "chunks": chunks,
-            "metadata": {
-                "total_chunks": len(chunks),
-                "average_chunk_size": sum(len(chunk) for chunk in chunks) / len(chunks),
-                "strategy": strategy
-            }
+            "chunks": result["chunks"],
+            "offsets": result["offsets"],
+            "metadata": chunk_metadata(result, strategy, unit)
         }
     except Exception as e:
-        return {"error": str(e)} 
\ No newline at end of file
+        return {"error": str(e)}
+
+@app.post("/chunk/batch")
+async def chunk_batch(data: Dict):
+    texts = data.get("texts", [])
+    strategy = data.get("strategy", "fixed")
+    chunk_size = data.get("chunk_size", 500)
+    overlap = data.get("overlap", 50)
+    unit = data.get("unit", "chars")
+
+    if not texts:
+        return {"error": "No texts provided"}
+
+    try:
+        results = await chunk_documents(texts, strategy, chunk_size, overlap, unit)
+        return {
+            "results": [
+                result if "error" in result else {
+                    "chunks": result["chunks"],
+                    "offsets": result["offsets"],
+                    "metadata": chunk_metadata(result, strategy, unit)
+                }
+                for result in results
+            ]
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+@app.post("/chunk/compare")
+async def compare_chunking(data: Dict):
+    text = data.get("text")
+    strategies = data.get("strategies", ["fixed", "sentence", "paragraph", "sliding"])
+    # Either explicit combinations or a chunk_size x overlap grid
+    configs = data.get("configs") or [
+        {"chunk_size": size, "overlap": overlap}
+        for size in data.get("chunk_sizes", [data.get("chunk_size", 500)])
+        for overlap in data.get("overlaps", [data.get("overlap", 50)])
+    ]
+    unit = data.get("unit", "chars")
+
+    if not text and not data.get("document_hash"):
+        return {"error": "No text provided"}
+
+    try:
+        doc_hash = chunk_comparer.prepare(text or None, data.get("document_hash"))
+        return {
+            "document_hash": doc_hash,
+            "unit": unit,
+            "results": chunk_comparer.compare(
+                doc_hash, strategies, configs, unit, data.get("include_offsets", True)
+            )
+        }
+    except Exception as e:
+        return {"error": str(e)}
@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+
+from PyPDF2 import PdfReader
+
+# Pages parsed per worker task; each task reopens the PDF, so keep this coarse
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+MAX_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 2)))
+CACHE_SIZE = int(os.getenv("PDF_TEXT_CACHE_SIZE", "32"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_page_cache: "OrderedDict[str, List[str]]" = OrderedDict()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def file_hash(pdf_bytes: bytes) -> str:
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def _count_pages(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """Worker: text of pages [start, stop) of the PDF at `path`"""
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _cache_get(key: str) -> Optional[List[str]]:
+    pages = _page_cache.get(key)
+    if pages is not None:
+        _page_cache.move_to_end(key)
+    return pages
+
+
+def _cache_put(key: str, pages: List[str]) -> None:
+    _page_cache[key] = pages
+    _page_cache.move_to_end(key)
+    while len(_page_cache) > CACHE_SIZE:
+        _page_cache.popitem(last=False)
+
+
+async def iter_pages(pdf_bytes: bytes) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Yield (page_number, text) in page order as soon as each page range is parsed.
+
+    Page ranges are parsed concurrently in a process pool from a temporary
+    copy of the upload, and a fully extracted document is cached by its
+    SHA-256 so re-uploads skip parsing entirely.
+    """
+    key = file_hash(pdf_bytes)
+    cached = _cache_get(key)
+    if cached is not None:
+        for number, text in enumerate(cached, start=1):
+            yield number, text
+        return
+
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    futures = []
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(pdf_bytes)
+
+        page_count = await loop.run_in_executor(None, _count_pages, path)
+        futures = [
+            loop.run_in_executor(executor, _extract_page_range, path, start, min(start + PAGES_PER_TASK, page_count))
+            for start in range(0, page_count, PAGES_PER_TASK)
+        ]
+
+        pages: List[str] = []
+        for future in futures:
+            for text in await future:
+                pages.append(text)
+                yield len(pages), text
+
+        _cache_put(key, pages)
+    finally:
+        for future in futures:
+            future.cancel()
+        # Let in-flight workers finish reading before removing the file
+        await asyncio.gather(*futures, return_exceptions=True)
+        os.remove(path)
+
+
+async def extract_text(pdf_bytes: bytes) -> Tuple[str, int]:
+    """Full document text, joined once, and its page count"""
+    pages = [text async for _, text in iter_pages(pdf_bytes)]
+    return "".join(pages), len(pages)
@@ -1,123 +1,284 @@
-from typing import List
+from array import array
+from functools import cached_property
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import re
 
+Offsets = Tuple[int, int]
+
+WHITESPACE = re.compile(r'\s+')
+NON_WHITESPACE = re.compile(r'\S')
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+BREAK_CHARS = (' ', '\n', '\t', '\r')
+
+
+class BoundaryIndex:
+    """
+    Sentence and paragraph boundaries of a text, computed lazily in one
+    regex pass each and shared by every strategy chunking the same text.
+
+    Positions are kept in compact integer arrays. Word breaks are found
+    with bounded C-level scans inside each chunk window, so chunking never
+    copies the text; substrings are only created when chunks are
+    materialized.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.typecode = 'i' if len(text) < 2 ** 31 else 'q'
+
+    def _between(self, pattern: re.Pattern) -> Tuple[array, array]:
+        # Non-empty, whitespace-trimmed spans between separator matches
+        starts, ends = array(self.typecode), array(self.typecode)
+        position = 0
+        for match in pattern.finditer(self.text):
+            self._append_trimmed(starts, ends, position, match.start())
+            position = match.end()
+        self._append_trimmed(starts, ends, position, len(self.text))
+        return starts, ends
+
+    def _append_trimmed(self, starts: array, ends: array, start: int, end: int) -> None:
+        text = self.text
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            starts.append(start)
+            ends.append(end)
+
+    @cached_property
+    def sentences(self) -> Tuple[array, array]:
+        """(starts, ends) of sentences"""
+        return self._between(SENTENCE_BREAK)
+
+    @cached_property
+    def paragraphs(self) -> Tuple[array, array]:
+        """(starts, ends) of paragraphs"""
+        return self._between(PARAGRAPH_BREAK)
+
+    def last_break(self, start: int, end: int) -> Optional[int]:
+        """Start of the last whitespace run strictly inside (start, end), if any"""
+        text = self.text
+        position = max(text.rfind(char, start + 1, end) for char in BREAK_CHARS)
+        if position == -1:
+            return None
+        while position - 1 > start and text[position - 1].isspace():
+            position -= 1
+        return position
+
+    def word_start(self, position: int, limit: int) -> int:
+        """First word start at or after `position`, or `position` itself if none is before `limit`"""
+        text = self.text
+        if position == 0 or (text[position - 1].isspace() and not text[position].isspace()):
+            return position
+        match = WHITESPACE.search(text, position, limit + 1)
+        if match and match.end() <= limit:
+            return match.end()
+        return position
+
+    def skip_space(self, position: int, stop: int) -> int:
+        """First non-whitespace position in [position, stop), or `stop`"""
+        match = NON_WHITESPACE.search(self.text, position, stop)
+        return match.start() if match else stop
+
+    def word_start_before(self, position: int, floor: int) -> int:
+        """Last word start in (floor, position], or `position` itself if there is none"""
+        text = self.text
+        if text[position - 1].isspace():
+            return position
+        position_break = max(text.rfind(char, floor + 1, position) for char in BREAK_CHARS)
+        return position_break + 1 if position_break != -1 else position
+
+
+class CharMeasure:
+    """Measures chunk sizes in characters"""
+
+    def size(self, start: int, end: int) -> int:
+        return end - start
+
+    def advance(self, position: int, units: int) -> int:
+        """Offset `units` after `position`"""
+        return position + units
+
+    def retreat(self, position: int, units: int) -> int:
+        """Offset `units` before `position`"""
+        return position - units
+
+
+CHARS = CharMeasure()
+
+
+def _validate(chunk_size: int, overlap: int) -> None:
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if overlap < 0 or overlap >= chunk_size:
+        raise ValueError("overlap must be between 0 and chunk_size - 1")
+
+
+def _window_end(index: BoundaryIndex, start: int, hard_end: int, previous_end: int) -> int:
+    """Last word break before `hard_end`, unless that would end the window inside the previous one"""
+    end = index.last_break(start, hard_end)
+    # A window ending at or before the previous end only repeats text already emitted,
+    # so cut the word instead
+    return end if end is not None and end > previous_end else hard_end
+
+
+def _fixed_offsets(index: BoundaryIndex, start: int, stop: int,
+                   chunk_size: int, overlap: int, measure=CHARS) -> Iterator[Offsets]:
+    previous_end = start
+    while start < stop:
+        hard_end = measure.advance(start, chunk_size)
+        if hard_end >= stop:
+            yield start, stop
+            return
+
+        end = _window_end(index, start, hard_end, previous_end)
+        yield start, end
+        previous_end = end
+
+        # The next chunk repeats the last `overlap` units, from a word start
+        next_start = index.word_start(max(measure.retreat(end, overlap), start + 1), end)
+        start = index.skip_space(max(next_start, start + 1), stop)
+
+
+def _sliding_offsets(index: BoundaryIndex, start: int, stop: int,
+                     chunk_size: int, overlap: int, measure=CHARS) -> Iterator[Offsets]:
+    stride = chunk_size - overlap
+    previous_end = start
+    while start < stop:
+        hard_end = measure.advance(start, chunk_size)
+        if hard_end >= stop:
+            yield start, stop
+            return
+
+        end = _window_end(index, start, hard_end, previous_end)
+        yield start, end
+        previous_end = end
+
+        # Windows advance by the stride (backing up to a word start), never past the previous
+        # end, and repeat at most `overlap` units even when the window was shortened
+        stride_start = index.word_start_before(min(measure.advance(start, stride), end), start)
+        overlap_start = index.word_start(max(measure.retreat(end, overlap), start + 1), end)
+        start = index.skip_space(max(stride_start, overlap_start), stop)
+
+
+def _packed_offsets(starts: array, ends: array, chunk_size: int, overlap: int,
+                    measure=CHARS) -> Iterator[Offsets]:
+    """Greedily pack consecutive units into chunks, repeating trailing units that fit in `overlap`"""
+    first, count = 0, len(starts)
+    while first < count:
+        last = first
+        while last + 1 < count and measure.size(starts[first], ends[last + 1]) <= chunk_size:
+            last += 1
+        yield starts[first], ends[last]
+        if last == count - 1:
+            return
+
+        carry = last + 1
+        while carry - 1 > first and measure.size(starts[carry - 1], ends[last]) <= overlap:
+            carry -= 1
+        # Don't emit a chunk that would only repeat the overlap
+        if measure.size(starts[carry], ends[last + 1]) > chunk_size:
+            carry = last + 1
+        first = carry
+
+
+def fixed_size_offsets(text: str, chunk_size: int = 500, overlap: int = 50,
+                       index: Optional[BoundaryIndex] = None, measure=CHARS) -> Iterator[Offsets]:
+    """
+    Yield (start, end) offsets of fixed-size chunks that break at whitespace,
+    each repeating about `overlap` units (characters by default) of the previous one
+    """
+    _validate(chunk_size, overlap)
+    index = index or BoundaryIndex(text)
+    return _fixed_offsets(index, 0, len(text), chunk_size, overlap, measure)
+
+
+def sentence_offsets(text: str, chunk_size: int = 500, overlap: int = 50,
+                     index: Optional[BoundaryIndex] = None, measure=CHARS) -> Iterator[Offsets]:
+    """
+    Yield offsets of chunks made of whole sentences; trailing sentences
+    totalling at most `overlap` units are repeated in the next chunk
+    """
+    _validate(chunk_size, overlap)
+    index = index or BoundaryIndex(text)
+    return _packed_offsets(*index.sentences, chunk_size, overlap, measure)
+
+
+def paragraph_offsets(text: str, chunk_size: int = 500, overlap: int = 50,
+                      index: Optional[BoundaryIndex] = None, measure=CHARS) -> Iterator[Offsets]:
+    """
+    Yield offsets of chunks made of whole paragraphs, repeating trailing
+    paragraphs that fit in `overlap`; paragraphs larger than `chunk_size`
+    are split with the fixed-size strategy
+    """
+    _validate(chunk_size, overlap)
+    index = index or BoundaryIndex(text)
+    starts, ends = index.paragraphs
+
+    def generate() -> Iterator[Offsets]:
+        first, count = 0, len(starts)
+        while first < count:
+            if measure.size(starts[first], ends[first]) > chunk_size:
+                yield from _fixed_offsets(index, starts[first], ends[first], chunk_size, overlap, measure)
+                first += 1
+                continue
+            # Pack the run of paragraphs up to the next oversized one
+            last = first
+            while last + 1 < count and measure.size(starts[last + 1], ends[last + 1]) <= chunk_size:
+                last += 1
+            yield from _packed_offsets(starts[first:last + 1], ends[first:last + 1], chunk_size, overlap, measure)
+            first = last + 1
+
+    return generate()
+
+
+def sliding_window_offsets(text: str, chunk_size: int = 500, overlap: int = 50,
+                           index: Optional[BoundaryIndex] = None, measure=CHARS) -> Iterator[Offsets]:
+    """
+    Yield offsets of windows starting every `chunk_size - overlap` units
+    (snapped to word starts) and ending at whitespace
+    """
+    _validate(chunk_size, overlap)
+    index = index or BoundaryIndex(text)
+    return _sliding_offsets(index, 0, len(text), chunk_size, overlap, measure)
+
+
+OFFSET_STRATEGIES: Dict[str, Callable[..., Iterator[Offsets]]] = {
+    "fixed": fixed_size_offsets,
+    "sentence": sentence_offsets,
+    "paragraph": paragraph_offsets,
+    "sliding": sliding_window_offsets,
+}
+
+
+def materialize(text: str, offsets) -> Iterator[str]:
+    """Lazily slice chunk strings out of the text"""
+    for start, end in offsets:
+        yield text[start:end]
+
+
 def fixed_size_chunker(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
     """
     Split text into chunks of fixed size with overlap
     """
-    chunks = []
-    start = 0
-    text_length = len(text)
-
-    while start < text_length:
-        end = start + chunk_size
-        
-        # If this is not the first chunk, include overlap
-        if start > 0:
-            start = start - overlap
-            
-        # If this is the last chunk, adjust end to text length
-        if end >= text_length:
-            chunks.append(text[start:])
-            break
-            
-        # Find the last space before the end to avoid cutting words
-        last_space = text.rfind(' ', start, end)
-        if last_space != -1:
-            end = last_space
-            
-        chunks.append(text[start:end])
-        start = end
-
-    return chunks
+    return list(materialize(text, fixed_size_offsets(text, chunk_size, overlap)))
 
 def sentence_chunker(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
     """
     Split text into chunks by sentences, trying to keep chunks close to chunk_size
     """
-    # Simple sentence splitting - can be improved with better regex or NLP
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    chunks = []
-    current_chunk = []
-    current_length = 0
-    
-    for sentence in sentences:
-        sentence_length = len(sentence)
-        
-        if current_length + sentence_length > chunk_size and current_chunk:
-            chunks.append(' '.join(current_chunk))
-            # Keep last sentence for overlap if needed
-            current_chunk = [current_chunk[-1]] if overlap > 0 else []
-            current_length = len(current_chunk[0]) if current_chunk else 0
-            
-        current_chunk.append(sentence)
-        current_length += sentence_length
-    
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
-    
-    return chunks
+    return list(materialize(text, sentence_offsets(text, chunk_size, overlap)))
 
 def paragraph_chunker(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
     """
     Split text into chunks by paragraphs, combining small paragraphs and splitting large ones
     """
-    # Split by double newline to identify paragraphs
-    paragraphs = re.split(r'\n\s*\n', text)
-    chunks = []
-    current_chunk = []
-    current_length = 0
-    
-    for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue
-            
-        para_length = len(para)
-        
-        # If paragraph is too large, split it using fixed_size_chunker
-        if para_length > chunk_size:
-            if current_chunk:
-                chunks.append('\n\n'.join(current_chunk))
-                current_chunk = []
-                current_length = 0
-            chunks.extend(fixed_size_chunker(para, chunk_size, overlap))
-            continue
-            
-        if current_length + para_length > chunk_size and current_chunk:
-            chunks.append('\n\n'.join(current_chunk))
-            current_chunk = []
-            current_length = 0
-            
-        current_chunk.append(para)
-        current_length += para_length
-    
-    if current_chunk:
-        chunks.append('\n\n'.join(current_chunk))
-    
-    return chunks
+    return list(materialize(text, paragraph_offsets(text, chunk_size, overlap)))
 
 def sliding_window_chunker(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
     """
     Split text using a sliding window approach with fixed overlap
     """
-    chunks = []
-    start = 0
-    stride = chunk_size - overlap
-    
-    while start < len(text):
-        end = start + chunk_size
-        
-        if end >= len(text):
-            chunks.append(text[start:])
-            break
-            
-        # Find the last space before the end
-        last_space = text.rfind(' ', start, end)
-        if last_space != -1:
-            end = last_space
-            
-        chunks.append(text[start:end])
-        start += stride
-    
-    return chunks 
\ No newline at end of file
+    return list(materialize(text, sliding_window_offsets(text, chunk_size, overlap)))
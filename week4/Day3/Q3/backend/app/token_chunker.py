@@ -0,0 +1,106 @@
+import asyncio
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from app.pdf_extractor import MAX_WORKERS, get_executor
+from app.text_chunker import CHARS, OFFSET_STRATEGIES, BoundaryIndex, materialize
+
+# tiktoken encoding name, or "hf:<model>" for a Hugging Face fast tokenizer
+TOKENIZER_NAME = os.getenv("CHUNK_TOKENIZER", "cl100k_base")
+UNITS = ("chars", "tokens")
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    """Load the tokenizer once per process"""
+    if TOKENIZER_NAME.startswith("hf:"):
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(TOKENIZER_NAME[3:], use_fast=True)
+
+    import tiktoken
+    return tiktoken.get_encoding(TOKENIZER_NAME)
+
+
+def token_starts(text: str) -> array:
+    """Character offset at which each token of `text` starts, from a single tokenization"""
+    tokenizer = get_tokenizer()
+    if TOKENIZER_NAME.startswith("hf:"):
+        encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        return array('q', (start for start, _ in encoding["offset_mapping"]))
+
+    _, offsets = tokenizer.decode_with_offsets(tokenizer.encode(text, disallowed_special=()))
+    return array('q', offsets)
+
+
+class TokenMeasure:
+    """
+    Measures chunk sizes in tokens using precomputed token start offsets,
+    so the chunking engine can cut on token boundaries without re-tokenizing
+    """
+
+    def __init__(self, text: str):
+        self.starts = token_starts(text)
+        self.text_length = len(text)
+
+    def _token_at(self, position: int) -> int:
+        return max(bisect_right(self.starts, position) - 1, 0)
+
+    def size(self, start: int, end: int) -> int:
+        """Tokens overlapping [start, end)"""
+        return bisect_left(self.starts, end) - self._token_at(start)
+
+    def advance(self, position: int, units: int) -> int:
+        index = self._token_at(position) + units
+        return self.starts[index] if index < len(self.starts) else self.text_length
+
+    def retreat(self, position: int, units: int) -> int:
+        index = max(bisect_left(self.starts, position) - units, 0)
+        return self.starts[index] if self.starts else 0
+
+
+def chunk_document(text: str, strategy: str = "fixed", chunk_size: int = 500,
+                   overlap: int = 50, unit: str = "chars") -> Dict[str, Any]:
+    """Chunk one document, returning chunk texts, offsets and sizes in the requested unit"""
+    chunker = OFFSET_STRATEGIES.get(strategy)
+    if not chunker:
+        raise ValueError("Invalid chunking strategy")
+    if unit not in UNITS:
+        raise ValueError(f"unit must be one of {', '.join(UNITS)}")
+
+    measure = TokenMeasure(text) if unit == "tokens" else CHARS
+    offsets = list(chunker(text, chunk_size, overlap, index=BoundaryIndex(text), measure=measure))
+    return {
+        "chunks": list(materialize(text, offsets)),
+        "offsets": [[start, end] for start, end in offsets],
+        "sizes": [measure.size(start, end) for start, end in offsets]
+    }
+
+
+def _chunk_group(texts: List[str], strategy: str, chunk_size: int, overlap: int, unit: str) -> List[Dict[str, Any]]:
+    # Worker: a group of documents per task amortizes pickling and tokenizer loading
+    results = []
+    for text in texts:
+        try:
+            results.append(chunk_document(text, strategy, chunk_size, overlap, unit))
+        except Exception as e:
+            results.append({"error": str(e)})
+    return results
+
+
+async def chunk_documents(texts: List[str], strategy: str = "fixed", chunk_size: int = 500,
+                          overlap: int = 50, unit: str = "chars") -> List[Dict[str, Any]]:
+    """Chunk many documents in parallel across the process pool, preserving input order"""
+    if not texts:
+        return []
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    group_size = -(-len(texts) // (MAX_WORKERS * 2))
+    groups = [texts[i:i + group_size] for i in range(0, len(texts), group_size)]
+    results = await asyncio.gather(*(
+        loop.run_in_executor(executor, _chunk_group, group, strategy, chunk_size, overlap, unit)
+        for group in groups
+    ))
+    return [result for group in results for result in group]
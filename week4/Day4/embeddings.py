@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import os
+import re
+from typing import List
+
+import httpx
+import numpy as np
+
+# "local" (sentence-transformers), "hashing" (dependency-free) or "remote" (OpenAI-compatible API)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "local")
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_API_URL = os.getenv("EMBEDDING_API_URL", "https://api.openai.com/v1/embeddings")
+EMBEDDING_API_KEY = os.getenv("EMBEDDING_API_KEY") or os.getenv("OPENAI_API_KEY")
+REMOTE_EMBEDDING_MODEL = os.getenv("REMOTE_EMBEDDING_MODEL", "text-embedding-3-small")
+
+
+class LocalEmbedder:
+    """sentence-transformers model, loaded on first use and run off the event loop"""
+
+    name = "local"
+    max_concurrency = 1
+
+    def __init__(self, model_name: str = LOCAL_EMBEDDING_MODEL):
+        self.model_name = model_name
+        self.model = None
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        if self.model is None:
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(self.model_name)
+        return self.model.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        return await asyncio.to_thread(self._encode, texts)
+
+
+class HashingEmbedder:
+    """Feature-hashed bag of words; no model download, useful offline and in tests"""
+
+    name = "hashing"
+    max_concurrency = 1
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                digest = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dimensions] += 1.0 if digest >> 63 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        return await asyncio.to_thread(self._encode, texts)
+
+
+class RemoteEmbedder:
+    """OpenAI-compatible embeddings API; several batches can be in flight at once"""
+
+    name = "remote"
+    max_concurrency = int(os.getenv("EMBEDDING_API_CONCURRENCY", "4"))
+
+    def __init__(self, url: str = EMBEDDING_API_URL, api_key: str = EMBEDDING_API_KEY,
+                 model: str = REMOTE_EMBEDDING_MODEL):
+        if not api_key:
+            raise ValueError("EMBEDDING_API_KEY is not set")
+        self.url = url
+        self.model = model
+        self.client = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=httpx.Timeout(60.0)
+        )
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        response = await self.client.post(self.url, json={"input": texts, "model": self.model})
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        vectors = np.array([item["embedding"] for item in data], dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+EMBEDDERS = {
+    "local": LocalEmbedder,
+    "hashing": HashingEmbedder,
+    "remote": RemoteEmbedder,
+}
+
+_embedder = None
+
+
+def get_embedder():
+    """The configured embedder, created once per process"""
+    global _embedder
+    if _embedder is None:
+        if EMBEDDING_BACKEND not in EMBEDDERS:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND: {EMBEDDING_BACKEND}")
+        _embedder = EMBEDDERS[EMBEDDING_BACKEND]()
+    return _embedder
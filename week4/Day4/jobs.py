@@ -0,0 +1,69 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Finished jobs kept for status queries before the oldest are dropped
+MAX_FINISHED_JOBS = 200
+
+
+class JobStore:
+    """In-memory registry of background ingestion jobs with progress and per-stage timings"""
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS):
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.max_finished = max_finished
+        self.lock = threading.Lock()
+
+    def create(self, **details) -> str:
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "stage": None,
+                "progress": 0.0,
+                "timings": {},
+                "created_at": time.time(),
+                "finished_at": None,
+                "result": None,
+                "error": None,
+                **details
+            }
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return {**job, "timings": dict(job["timings"])} if job else None
+
+    def update(self, job_id: str, **fields) -> None:
+        with self.lock:
+            self.jobs[job_id].update(fields)
+
+    def start_stage(self, job_id: str, stage: str) -> None:
+        self.update(job_id, status="running", stage=stage)
+
+    def add_timing(self, job_id: str, stage: str, seconds: float) -> None:
+        with self.lock:
+            timings = self.jobs[job_id]["timings"]
+            timings[stage] = round(timings.get(stage, 0.0) + seconds, 4)
+
+    def finish(self, job_id: str, result: Any = None, error: Optional[str] = None) -> None:
+        with self.lock:
+            job = self.jobs[job_id]
+            job.update(
+                status="failed" if error else "completed",
+                progress=job["progress"] if error else 1.0,
+                finished_at=time.time(),
+                result=result,
+                error=error
+            )
+            job["timings"]["total"] = round(job["finished_at"] - job["created_at"], 4)
+            self._evict()
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job["finished_at"] is not None]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
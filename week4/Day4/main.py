@@ -3,6 +3,10 @@ from routes import ingest
 
 app = FastAPI()
 
+@app.on_event("shutdown")
+def stop_ingest_workers():
+    ingest.shutdown_executor()
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
@@ -1,12 +1,42 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, HTTPException
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.document_loaders import PyPDFLoader
-import tempfile
+from langchain.schema import Document
+from concurrent.futures import ProcessPoolExecutor
+from pypdf import PdfReader
+import asyncio
+import io
 import os
+import time
 from pprint import pprint
+from jobs import JobStore
+from embeddings import get_embedder
+from vector_store import VectorStore, content_hash
 
 router = APIRouter()
 
+# Each job parses in its own process pool; at most MAX_ACTIVE_JOBS jobs run at once
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 2)))
+MAX_ACTIVE_JOBS = int(os.getenv("INGEST_MAX_ACTIVE_JOBS", "2"))
+INGEST_DEBUG = os.getenv("INGEST_DEBUG", "").lower() in ("1", "true", "yes")
+PAGES_PER_TASK = int(os.getenv("INGEST_PAGES_PER_TASK", "8"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# Bounded queues between stages keep memory flat regardless of PDF size
+CHUNK_QUEUE_SIZE = EMBED_BATCH_SIZE * 4
+STORE_QUEUE_SIZE = 4
+
+job_store = JobStore()
+vector_store = VectorStore()
+# One process pool per running job, each worker holding that job's PDF
+_executors = set()
+_job_slots = None
+_job_tasks = set()
+
+
+def shutdown_executor():
+    for executor in list(_executors):
+        executor.shutdown(cancel_futures=True)
+    _executors.clear()
+
 
 def print_documents_nicely(documents):
     for i, doc in enumerate(documents, 1):
@@ -19,24 +49,30 @@ def print_documents_nicely(documents):
         print("\n" + "-"*40)
 
 
-@router.post("/upload")
-async def upload_pdf(file: UploadFile = File(...)):
-    # Save uploaded file to a temp file
-    suffix = os.path.splitext(file.filename)[1]
-    if suffix != ".pdf":
-        return {"error": "Only PDF files are supported for now"}
+# Each worker process receives the job's PDF bytes once and reuses the reader for every range
+_worker_reader = None
+
+
+def _open_in_worker(pdf_bytes: bytes):
+    global _worker_reader
+    _worker_reader = PdfReader(io.BytesIO(pdf_bytes))
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        contents = await file.read()
-        tmp.write(contents)
-        tmp_path = tmp.name
 
-    # Load documents from the temp PDF file path
-    loader = PyPDFLoader(tmp_path)
-    documents = loader.load()
+def count_pages() -> int:
+    return len(_worker_reader.pages)
 
-    # Delete the temp file explicitly after loading
-    os.unlink(tmp_path)
+
+def parse_and_split(filename: str, start: int, stop: int):
+    """Worker: load pages [start, stop) from the job's PDF and split them into chunks"""
+    began = time.perf_counter()
+    documents = [
+        Document(
+            page_content=_worker_reader.pages[page].extract_text() or "",
+            metadata={"source": filename, "page": page}
+        )
+        for page in range(start, stop)
+    ]
+    parsed = time.perf_counter()
 
     # Create text splitter
     splitter = RecursiveCharacterTextSplitter(
@@ -44,15 +80,217 @@ async def upload_pdf(file: UploadFile = File(...)):
         chunk_overlap=200,
         separators=["\n", "\n\n", " ", ". "]
     )
-
-    # Split documents into chunks
     chunks = splitter.split_documents(documents)
-    # Example usage assuming 'documents' is your list of Document objects
-    print_documents_nicely(chunks)
+    if INGEST_DEBUG:
+        print_documents_nicely(chunks)
+
+    return chunks, parsed - began, time.perf_counter() - parsed
+
+
+async def parse_stage(job_id, pdf_bytes, filename, chunk_queue, counts):
+    """Parse and split page ranges in the process pool, feeding chunks downstream as ranges finish"""
+    executor = ProcessPoolExecutor(
+        max_workers=INGEST_WORKERS,
+        initializer=_open_in_worker,
+        initargs=(pdf_bytes,)
+    )
+    _executors.add(executor)
+    try:
+        await _parse_ranges(job_id, executor, filename, chunk_queue, counts)
+    finally:
+        _executors.discard(executor)
+        # Don't block the event loop waiting for workers to exit
+        executor.shutdown(wait=False, cancel_futures=True)
+    await chunk_queue.put(None)
+
+
+async def _parse_ranges(job_id, executor, filename, chunk_queue, counts):
+    loop = asyncio.get_running_loop()
+    began = time.perf_counter()
+    page_count = await loop.run_in_executor(executor, count_pages)
+    job_store.add_timing(job_id, "open", time.perf_counter() - began)
+    job_store.update(job_id, pages=page_count)
+    counts["page_count"] = page_count
+
+    # A range holds its slot until its chunks are queued, so finished ranges can't pile up
+    slots = asyncio.Semaphore(INGEST_WORKERS)
+
+    async def run_range(start, stop):
+        async with slots:
+            chunks, parse_seconds, split_seconds = await loop.run_in_executor(
+                executor, parse_and_split, filename, start, stop
+            )
+            job_store.add_timing(job_id, "parse", parse_seconds)
+            job_store.add_timing(job_id, "split", split_seconds)
+            for chunk in chunks:
+                await chunk_queue.put(chunk)
+            counts["chunks"] += len(chunks)
+            counts["pages_done"] += stop - start
+            report_progress(job_id, counts)
+
+    tasks = [
+        asyncio.create_task(run_range(start, min(start + PAGES_PER_TASK, page_count)))
+        for start in range(0, page_count, PAGES_PER_TASK)
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # gather leaves the other ranges running when one fails; they would block on the queue forever
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+async def embed_stage(job_id, chunk_queue, store_queue, counts):
+    """Batch chunks, skip ones already stored, and embed the rest"""
+    embedder = get_embedder()
+    in_flight = asyncio.Semaphore(embedder.max_concurrency)
+    pending = set()
+    errors = []
+
+    def batch_done(task):
+        pending.discard(task)
+        # Keep the failure; a discarded task is never awaited and its error would be lost
+        if not task.cancelled() and task.exception() is not None:
+            errors.append(task.exception())
+
+    async def embed_batch(batch):
+        try:
+            ids = [content_hash(chunk.page_content) for chunk in batch]
+            existing = await asyncio.to_thread(vector_store.existing_ids, ids)
+            fresh = {}
+            for chunk_id, chunk in zip(ids, batch):
+                if chunk_id not in existing:
+                    fresh.setdefault(chunk_id, chunk)
+            counts["skipped"] += len(batch) - len(fresh)
+            if not fresh:
+                return
+
+            began = time.perf_counter()
+            vectors = await embedder.embed([chunk.page_content for chunk in fresh.values()])
+            job_store.add_timing(job_id, "embed", time.perf_counter() - began)
+            counts["embedded"] += len(fresh)
+            await store_queue.put((list(fresh.keys()), list(fresh.values()), vectors))
+        finally:
+            in_flight.release()
+
+    async def flush(batch):
+        await in_flight.acquire()
+        if errors:
+            in_flight.release()
+            raise errors[0]
+        task = asyncio.create_task(embed_batch(batch))
+        pending.add(task)
+        task.add_done_callback(batch_done)
+
+    try:
+        batch = []
+        while True:
+            chunk = await chunk_queue.get()
+            if chunk is None:
+                break
+            batch.append(chunk)
+            if len(batch) >= EMBED_BATCH_SIZE:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+        await asyncio.gather(*pending)
+        if errors:
+            raise errors[0]
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        raise
+    await store_queue.put(None)
+
+
+async def store_stage(job_id, store_queue, counts):
+    """Upsert embedded chunks into the vector store by content hash"""
+    while True:
+        item = await store_queue.get()
+        if item is None:
+            return
+        ids, chunks, vectors = item
+        began = time.perf_counter()
+        counts["stored"] += await asyncio.to_thread(
+            vector_store.upsert,
+            ids,
+            [chunk.page_content for chunk in chunks],
+            [chunk.metadata for chunk in chunks],
+            vectors
+        )
+        job_store.add_timing(job_id, "store", time.perf_counter() - began)
+        report_progress(job_id, counts)
+
+
+def report_progress(job_id, counts):
+    # Half for parsing, half for writing; the chunk total is extrapolated from the pages parsed so far
+    parsed = counts["pages_done"] / counts["page_count"] if counts["page_count"] else 0.0
+    written = (counts["stored"] + counts["skipped"]) / counts["chunks"] if counts["chunks"] else 0.0
+    job_store.update(
+        job_id,
+        progress=round(parsed / 2 + written * parsed / 2, 4),
+        pages_done=counts["pages_done"],
+        chunks=counts["chunks"],
+        embedded=counts["embedded"],
+        skipped=counts["skipped"],
+        stored=counts["stored"]
+    )
+
+
+async def run_ingest_job(job_id: str, pdf_bytes: bytes, filename: str):
+    async with _job_slots:
+        counts = {"page_count": 0, "pages_done": 0, "chunks": 0, "embedded": 0, "skipped": 0, "stored": 0}
+        chunk_queue = asyncio.Queue(maxsize=CHUNK_QUEUE_SIZE)
+        store_queue = asyncio.Queue(maxsize=STORE_QUEUE_SIZE)
+
+        # Parsing, embedding and writing overlap, connected by the bounded queues
+        job_store.start_stage(job_id, "pipeline")
+        stages = [
+            asyncio.create_task(parse_stage(job_id, pdf_bytes, filename, chunk_queue, counts)),
+            asyncio.create_task(embed_stage(job_id, chunk_queue, store_queue, counts)),
+            asyncio.create_task(store_stage(job_id, store_queue, counts)),
+        ]
+        try:
+            await asyncio.gather(*stages)
+            report_progress(job_id, counts)
+            job_store.finish(job_id, result={
+                "message": "PDF processed and stored",
+                "num_chunks": counts["chunks"],
+                "embedded": counts["embedded"],
+                "skipped_existing": counts["skipped"],
+                "stored": counts["stored"]
+            })
+        except Exception as e:
+            for stage in stages:
+                stage.cancel()
+            job_store.finish(job_id, error=str(e))
+
+
+@router.post("/upload", status_code=202)
+async def upload_pdf(file: UploadFile = File(...)):
+    global _job_slots
+    suffix = os.path.splitext(file.filename)[1]
+    if suffix != ".pdf":
+        raise HTTPException(status_code=400, detail="Only PDF files are supported for now")
+
+    # Parsed straight from memory; no temp file round trip
+    contents = await file.read()
+
+    if _job_slots is None:
+        _job_slots = asyncio.Semaphore(MAX_ACTIVE_JOBS)
+    job_id = job_store.create(filename=file.filename, size_bytes=len(contents))
+    task = asyncio.create_task(run_ingest_job(job_id, contents, file.filename))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+
+    return {"job_id": job_id, "status": "queued", "status_url": f"/api/ingest/jobs/{job_id}"}
 
-   
-    # Here you would embed and store your chunks
-    # embeddings = embed_chunks(chunks)
-    # store_chunks(chunks, embeddings)
 
-    return {"message": "PDF processed and stored", "num_chunks": len(chunks)}
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List
+
+import numpy as np
+
+VECTOR_STORE_PATH = os.getenv(
+    "VECTOR_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "vector_store.sqlite")
+)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class VectorStore:
+    """
+    SQLite-backed chunk store keyed by content hash.
+
+    Upserting a chunk that is already stored only refreshes its metadata,
+    so re-ingesting a PDF never duplicates rows, and callers can skip
+    embedding chunks whose hash already exists.
+    """
+
+    def __init__(self, path: str = VECTOR_STORE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS chunks (
+                       id TEXT PRIMARY KEY,
+                       content TEXT NOT NULL,
+                       metadata TEXT NOT NULL,
+                       embedding BLOB NOT NULL
+                   )"""
+            )
+
+    def existing_ids(self, ids: List[str]) -> set:
+        found = set()
+        with self.lock:
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT id FROM chunks WHERE id IN ({','.join('?' * len(batch))})", batch
+                )
+                found.update(row[0] for row in rows)
+        return found
+
+    def upsert(self, ids: List[str], contents: List[str], metadatas: List[Dict[str, Any]],
+               embeddings: np.ndarray) -> int:
+        with self.lock, self.conn:
+            self.conn.executemany(
+                """INSERT INTO chunks (id, content, metadata, embedding) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET metadata = excluded.metadata, embedding = excluded.embedding""",
+                [
+                    (chunk_id, content, json.dumps(metadata), np.asarray(vector, dtype=np.float32).tobytes())
+                    for chunk_id, content, metadata, vector in zip(ids, contents, metadatas, embeddings)
+                ]
+            )
+        return len(ids)
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
@@ -1,8 +1,16 @@
 from fastapi import FastAPI
 from routes import ingest, query
+from services.vectorstore import get_vector_index
+from services.bm25 import get_bm25_index
 
 app = FastAPI()
 
+@app.on_event("startup")
+def load_indexes():
+    # Memory-map the persisted vectors and rebuild BM25 before the first query arrives
+    get_vector_index()
+    get_bm25_index()
+
 @app.get("/")
 async def root():
     return {"message": "Hello World", "status": "Server is running!"}
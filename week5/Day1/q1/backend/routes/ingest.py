@@ -1,19 +1,28 @@
+import asyncio
 from fastapi import APIRouter, UploadFile, File
-from utils.file_parser import extract_text_from_pdf
-from services.chunker import chunk_text
-# from services.embedder import embed_chunks
-# from services.vectorstore import store_chunks
+from utils.file_parser import iter_pages
+from services.chunker import chunk_pages
+from services.embedder import embed_chunks
+from services.vectorstore import store_chunks
+from services.bm25 import get_bm25_index
 
 router = APIRouter()
 
 @router.post("/upload")
 async def upload_pdf(file: UploadFile = File(...)):
     contents = await file.read()
-    text = extract_text_from_pdf(contents)
+    # Pages are chunked as they come out of the parallel extractor, off the event loop
+    page_chunks = await asyncio.to_thread(lambda: list(chunk_pages(iter_pages(contents))))
+    chunks = [chunk["text"] for chunk in page_chunks]
 
-    chunks = chunk_text(text)
-    print(chunks)
-    # embeddings = embed_chunks(chunks)
-    # store_chunks(chunks, embeddings)
+    # Embedding and writing block, so keep them off the event loop
+    embeddings = await asyncio.to_thread(embed_chunks, chunks)
+    metadatas = [
+        {"source": file.filename, "chunk": i, "page": chunk["page"]}
+        for i, chunk in enumerate(page_chunks)
+    ]
+    ids = await asyncio.to_thread(store_chunks, chunks, embeddings, metadatas)
+    # Keep the sparse index in step with the dense one
+    await asyncio.to_thread(get_bm25_index().add, ids, chunks)
 
-    return {"message": "PDF processed and stored", "num_chunks": len(chunks)}
\ No newline at end of file
+    return {"message": "PDF processed and stored", "num_chunks": len(chunks)}
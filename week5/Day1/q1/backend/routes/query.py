@@ -1,24 +1,53 @@
+import asyncio
+import time
+from typing import Literal
 from fastapi import APIRouter
-from pydantic import BaseModel
-# from services.embedder import embed_query
-# from services.retriever import retrieve_chunks
-# from services.llm import generate_answer
+from pydantic import BaseModel, Field
+from services.embedder import embed_query
+from services.retriever import retrieve_chunks, hybrid_retrieve
+from services.llm import generate_answer
 
 router = APIRouter()
 
 class QueryRequest(BaseModel):
     query: str
-    top_k: int = 4
+    top_k: int = Field(4, ge=1, le=100)
+    mode: Literal["hybrid", "vector"] = "hybrid"
 
 @router.post("/query")
 async def ask_question(request: QueryRequest):
-    # query_embedding = embed_query(request.query)
-    # chunks = retrieve_chunks(query_embedding, k=request.top_k)
-    # chunk_texts = [chunk["document"] for chunk in chunks]
+    began = time.perf_counter()
+
+    if request.mode == "hybrid":
+        chunks, timings = await hybrid_retrieve(request.query, request.top_k)
+    else:
+        stage = time.perf_counter()
+        query_embedding = await asyncio.to_thread(embed_query, request.query)
+        embedded = time.perf_counter()
+        chunks = retrieve_chunks(query_embedding, k=request.top_k)
+        timings = {
+            "embed_ms": round((embedded - stage) * 1000, 2),
+            "vector_search_ms": round((time.perf_counter() - embedded) * 1000, 2)
+        }
+    retrieved = time.perf_counter()
+    timings["retrieval_ms"] = round((retrieved - began) * 1000, 2)
+
+    chunk_texts = [chunk["document"] for chunk in chunks]
+    answer = await asyncio.to_thread(generate_answer, request.query, chunk_texts)
+    timings["generate_ms"] = round((time.perf_counter() - retrieved) * 1000, 2)
+    timings["total_ms"] = round((time.perf_counter() - began) * 1000, 2)
 
-    # answer = generate_answer(request.query, chunk_texts)
     return {
         "question": request.query,
-        "answer": "answer",
-        "contexts": "contexts"
-    }
\ No newline at end of file
+        "answer": answer,
+        "contexts": chunk_texts,
+        "sources": [
+            {key: value for key, value in chunk.items() if key != "document"}
+            for chunk in chunks
+        ],
+        "metadata": {
+            "mode": request.mode,
+            "top_k": request.top_k,
+            "latency": timings
+        }
+    }
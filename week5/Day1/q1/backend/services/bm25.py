@@ -0,0 +1,82 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Keeps compound terms like part numbers ("ab-1234", "v2.1") as single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        # Also index the parts of compound terms so "1234" finds "ab-1234"
+        if not token.isalnum():
+            tokens.extend(part for part in re.split(r"[-_./]", token) if part)
+    return tokens
+
+
+class BM25Index:
+    """
+    Sparse BM25 index over stored chunks, keyed by the same ids as the
+    vector index and extended incrementally as chunks are ingested.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        # Keyed by id: concurrent ingests may add their (sequential) ids out of order
+        self.doc_lengths: Dict[int, int] = {}
+        self.total_length = 0
+        self.lock = threading.Lock()
+
+    def add(self, ids: List[int], documents: List[str]) -> None:
+        with self.lock:
+            for doc_id, document in zip(ids, documents):
+                if doc_id in self.doc_lengths:
+                    continue
+                terms = tokenize(document)
+                for term, freq in Counter(terms).items():
+                    self.postings[term][doc_id] = freq
+                self.doc_lengths[doc_id] = len(terms)
+                self.total_length += len(terms)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """(id, score) of the top-k chunks for the query terms, best first"""
+        with self.lock:
+            count = len(self.doc_lengths)
+            if not count:
+                return []
+            avg_length = self.total_length / count
+            scores: Dict[int, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, freq in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * freq * (self.k1 + 1) / (freq + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+_index: Optional[BM25Index] = None
+_index_lock = threading.Lock()
+
+
+def get_bm25_index() -> BM25Index:
+    """Shared BM25 index, rebuilt from the persisted chunks on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from services.vectorstore import get_vector_index
+                documents = list(get_vector_index().documents)
+                index = BM25Index()
+                index.add(list(range(len(documents))), documents)
+                _index = index
+    return _index
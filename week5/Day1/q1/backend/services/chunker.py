@@ -7,4 +7,15 @@ def chunk_text(text: str, chunk_size: int = 500, chunk_overlap: int = 50) -> lis
         separators=["\n\n", "\n", ".", " "],
     )
     chunks = splitter.split_text(text)
-    return chunks
\ No newline at end of file
+    return chunks
+
+def chunk_pages(pages, chunk_size: int = 500, chunk_overlap: int = 50):
+    """Chunk an iterable of {"page", "text"} dicts lazily, yielding {"text", "page"} per chunk"""
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", ".", " "],
+    )
+    for page in pages:
+        for chunk in splitter.split_text(page["text"]):
+            yield {"text": chunk, "page": page["page"]}
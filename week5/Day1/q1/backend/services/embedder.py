@@ -0,0 +1,45 @@
+import os
+import threading
+from typing import List
+
+import numpy as np
+
+# "openai" (langchain-openai) or "local" (sentence-transformers through langchain-community)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai" if os.getenv("OPENAI_API_KEY") else "local")
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+_embedder = None
+_lock = threading.Lock()
+
+
+def get_embedder():
+    """Single embedder instance shared by the ingest and query routes"""
+    global _embedder
+    if _embedder is None:
+        with _lock:
+            if _embedder is None:
+                if EMBEDDING_BACKEND == "openai":
+                    from langchain_openai import OpenAIEmbeddings
+                    _embedder = OpenAIEmbeddings(model=OPENAI_EMBEDDING_MODEL)
+                elif EMBEDDING_BACKEND == "local":
+                    from langchain_community.embeddings import HuggingFaceEmbeddings
+                    _embedder = HuggingFaceEmbeddings(model_name=LOCAL_EMBEDDING_MODEL)
+                else:
+                    raise ValueError(f"Unknown EMBEDDING_BACKEND: {EMBEDDING_BACKEND}")
+    return _embedder
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    # Unit vectors, so inner product is cosine similarity
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+def embed_chunks(chunks: List[str]) -> np.ndarray:
+    if not chunks:
+        return np.zeros((0, 0), dtype=np.float32)
+    return _normalize(np.asarray(get_embedder().embed_documents(chunks), dtype=np.float32))
+
+
+def embed_query(query: str) -> np.ndarray:
+    return _normalize(np.asarray(get_embedder().embed_query(query), dtype=np.float32))
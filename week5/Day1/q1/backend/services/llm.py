@@ -0,0 +1,30 @@
+import os
+from typing import List
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+
+_llm = None
+
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        from langchain_openai import ChatOpenAI
+        _llm = ChatOpenAI(model=LLM_MODEL, temperature=0)
+    return _llm
+
+
+def generate_answer(question: str, contexts: List[str]) -> str:
+    if not contexts:
+        return "No relevant documents found. Upload a PDF first."
+    if not os.getenv("OPENAI_API_KEY"):
+        # Without an LLM, return the best matching passage
+        return contexts[0]
+
+    context_block = "\n\n".join(f"[{i}] {context}" for i, context in enumerate(contexts, 1))
+    prompt = (
+        "Answer the question using only the context below. "
+        "If the answer is not in the context, say you don't know.\n\n"
+        f"Context:\n{context_block}\n\nQuestion: {question}\nAnswer:"
+    )
+    return get_llm().invoke(prompt).content
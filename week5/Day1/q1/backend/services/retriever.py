@@ -0,0 +1,81 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from services.bm25 import get_bm25_index
+from services.embedder import embed_query
+from services.vectorstore import get_vector_index
+
+# Standard reciprocal-rank-fusion constant
+RRF_K = 60
+
+
+def retrieve_chunks(query_embedding: np.ndarray, k: int = 4) -> List[Dict[str, Any]]:
+    """Top-k stored chunks by cosine similarity, best first"""
+    return get_vector_index().search(query_embedding, k)
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[int]], k: int, rrf_k: int = RRF_K) -> List[Tuple[int, float, Dict[str, int]]]:
+    """Fuse ranked id lists: score = sum of 1 / (rrf_k + rank) over the rankings an id appears in"""
+    scores: Dict[int, float] = {}
+    ranks: Dict[int, Dict[str, int]] = {}
+    for name, ids in rankings.items():
+        for rank, doc_id in enumerate(ids, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+            ranks.setdefault(doc_id, {})[name] = rank
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+    return [(doc_id, score, ranks[doc_id]) for doc_id, score in fused]
+
+
+def _timed(fn, *args):
+    began = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - began) * 1000
+
+
+def _dense(query: str, candidates: int):
+    embedding, embed_ms = _timed(embed_query, query)
+    results, search_ms = _timed(retrieve_chunks, embedding, candidates)
+    return results, embed_ms, search_ms
+
+
+async def hybrid_retrieve(query: str, k: int = 4) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+    """
+    Dense and BM25 retrieval run in parallel, fused with reciprocal-rank fusion
+
+    Returns:
+        (chunks, timings in milliseconds per stage)
+    """
+    candidates = max(k * 4, 20)
+    (dense, embed_ms, vector_ms), (sparse, bm25_ms) = await asyncio.gather(
+        asyncio.to_thread(_dense, query, candidates),
+        asyncio.to_thread(_timed, get_bm25_index().search, query, candidates)
+    )
+
+    began = time.perf_counter()
+    index = get_vector_index()
+    vector_scores = {chunk["id"]: chunk["score"] for chunk in dense}
+    bm25_scores = dict(sparse)
+    fused = reciprocal_rank_fusion({
+        "vector": [chunk["id"] for chunk in dense],
+        "bm25": [doc_id for doc_id, _ in sparse]
+    }, k)
+    chunks = [{
+        "id": doc_id,
+        "document": index.documents[doc_id],
+        "metadata": index.metadatas[doc_id],
+        "score": score,
+        "ranks": ranks,
+        "vector_score": vector_scores.get(doc_id),
+        "bm25_score": bm25_scores.get(doc_id)
+    } for doc_id, score, ranks in fused]
+
+    timings = {
+        "embed_ms": round(embed_ms, 2),
+        "vector_search_ms": round(vector_ms, 2),
+        "bm25_search_ms": round(bm25_ms, 2),
+        "fusion_ms": round((time.perf_counter() - began) * 1000, 2)
+    }
+    return chunks, timings
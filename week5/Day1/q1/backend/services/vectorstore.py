@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+INDEX_DIR = os.getenv(
+    "VECTOR_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "index")
+)
+# Collections at least this large are searched through HNSW (when hnswlib is installed)
+HNSW_THRESHOLD = int(os.getenv("HNSW_THRESHOLD", "50000"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+
+logger = logging.getLogger(__name__)
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+class VectorIndex:
+    """
+    In-process vector index persisted under `index_dir`.
+
+    Embeddings are appended to a raw float32 file that is memory-mapped on
+    startup, so opening a large index costs no parsing and searches read
+    straight from the page cache. Small collections are searched exactly
+    with one matrix-vector product; above HNSW_THRESHOLD an HNSW graph is
+    built once, saved next to the vectors and updated on later ingests.
+    """
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        self.index_dir = index_dir
+        os.makedirs(index_dir, exist_ok=True)
+        self.vectors_path = os.path.join(index_dir, "embeddings.f32")
+        self.chunks_path = os.path.join(index_dir, "chunks.jsonl")
+        self.meta_path = os.path.join(index_dir, "meta.json")
+        self.hnsw_path = os.path.join(index_dir, "hnsw.bin")
+        self.lock = threading.Lock()
+
+        meta = {}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        self.dim: Optional[int] = meta.get("dim")
+        self.count: int = meta.get("count", 0)
+
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        committed_bytes = 0
+        if os.path.exists(self.chunks_path):
+            with open(self.chunks_path, "rb") as f:
+                for line in f:
+                    if len(self.documents) == self.count:
+                        break
+                    record = json.loads(line)
+                    self.documents.append(record["document"])
+                    self.metadatas.append(record["metadata"])
+                    committed_bytes += len(line)
+            # Drop anything past the last recorded count (a torn write)
+            os.truncate(self.chunks_path, committed_bytes)
+        # Vectors past the committed count are a torn write too, including from a first ingest
+        # that crashed before meta.json existed
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) > self.count * (self.dim or 0) * 4:
+            os.truncate(self.vectors_path, self.count * (self.dim or 0) * 4)
+
+        self.vectors = self._map_vectors()
+        self.hnsw = self._load_hnsw()
+
+    def _map_vectors(self) -> np.ndarray:
+        if not self.count:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.count, self.dim))
+
+    def _load_hnsw(self):
+        if hnswlib is None or not self.count:
+            return None
+        if not os.path.exists(self.hnsw_path):
+            if self.count < HNSW_THRESHOLD:
+                return None
+            # meta.json was saved but the process died before the graph was first written
+            logger.warning("HNSW index missing for %d vectors, rebuilding", self.count)
+            return self._build_hnsw()
+
+        index = hnswlib.Index(space="ip", dim=self.dim)
+        index.load_index(self.hnsw_path, max_elements=self.count)
+        indexed = index.get_current_count()
+        if indexed > self.count:
+            logger.warning("HNSW index has %d items but only %d vectors are committed, rebuilding",
+                           indexed, self.count)
+            return self._build_hnsw()
+        if indexed < self.count:
+            # meta.json is saved before hnsw.bin, so a crash in between leaves the graph behind
+            logger.warning("HNSW index is missing %d of %d vectors, adding them", self.count - indexed, self.count)
+            index.add_items(np.asarray(self.vectors[indexed:]), np.arange(indexed, self.count))
+            index.save_index(self.hnsw_path)
+        index.set_ef(HNSW_EF_SEARCH)
+        return index
+
+    def _build_hnsw(self):
+        index = hnswlib.Index(space="ip", dim=self.dim)
+        index.init_index(max_elements=self.count, ef_construction=200, M=16)
+        index.add_items(np.asarray(self.vectors), np.arange(self.count))
+        index.set_ef(HNSW_EF_SEARCH)
+        index.save_index(self.hnsw_path)
+        return index
+
+    def _update_hnsw(self, start: int, vectors: np.ndarray) -> None:
+        if hnswlib is None or self.count < HNSW_THRESHOLD:
+            return
+        if self.hnsw is None:
+            # First time over the threshold: index everything stored so far
+            self.hnsw = self._build_hnsw()
+            return
+        self.hnsw.resize_index(self.count)
+        self.hnsw.add_items(vectors, np.arange(start, self.count))
+        self.hnsw.save_index(self.hnsw_path)
+
+    def add(self, documents: List[str], embeddings: np.ndarray,
+            metadatas: Optional[List[Dict[str, Any]]] = None) -> List[int]:
+        """Append chunks with their (unit-normalized) embeddings; returns their ids"""
+        if not documents:
+            return []
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        metadatas = metadatas or [{} for _ in documents]
+
+        with self.lock:
+            if self.dim is None:
+                self.dim = embeddings.shape[1]
+            elif embeddings.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {embeddings.shape[1]} does not match index dimension {self.dim}")
+
+            start = self.count
+            with open(self.vectors_path, "ab") as f:
+                f.write(embeddings.tobytes())
+            with open(self.chunks_path, "a", encoding="utf-8") as f:
+                for document, metadata in zip(documents, metadatas):
+                    f.write(json.dumps({"document": document, "metadata": metadata}) + "\n")
+
+            self.count += len(documents)
+            # meta.json is written last: it is what makes the appended rows visible
+            # (hnsw.bin is saved after it and caught up on load if that save was lost)
+            tmp_path = self.meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim, "count": self.count}, f)
+            os.replace(tmp_path, self.meta_path)
+
+            self.documents.extend(documents)
+            self.metadatas.extend(metadatas)
+            self.vectors = self._map_vectors()
+            self._update_hnsw(start, embeddings)
+            return list(range(start, self.count))
+
+    def search(self, query_embedding: np.ndarray, k: int = 4) -> List[Dict[str, Any]]:
+        vectors, hnsw = self.vectors, self.hnsw
+        count = len(vectors)
+        k = min(k, count)
+        if k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        if hnsw is not None and hnsw.get_current_count() == count:
+            labels, distances = hnsw.knn_query(query, k=k)
+            ids, scores = labels[0], 1.0 - distances[0]
+        else:
+            if hnsw is not None:
+                logger.warning("HNSW index has %d of %d vectors, falling back to exact search",
+                               hnsw.get_current_count(), count)
+            all_scores = vectors @ query
+            ids = np.argpartition(-all_scores, k - 1)[:k]
+            ids = ids[np.argsort(-all_scores[ids])]
+            scores = all_scores[ids]
+
+        return [{
+            "id": int(i),
+            "document": self.documents[i],
+            "metadata": self.metadatas[i],
+            "score": float(score)
+        } for i, score in zip(ids, scores)]
+
+
+_index: Optional[VectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index() -> VectorIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VectorIndex()
+    return _index
+
+
+def store_chunks(chunks: List[str], embeddings: np.ndarray,
+                 metadatas: Optional[List[Dict[str, Any]]] = None) -> List[int]:
+    return get_vector_index().add(chunks, embeddings, metadatas)
@@ -1,9 +1,61 @@
 import fitz  # PyMuPDF
-from typing import Union
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Union
+
+# Below this many pages, starting worker processes costs more than it saves
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 2)))
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+
+# Each worker process opens the byte stream once and reuses it for every range it extracts
+_worker_doc = None
+
+
+def _open_in_worker(file_bytes: bytes):
+    global _worker_doc
+    _worker_doc = fitz.open(stream=file_bytes, filetype="pdf")
+
+
+def _extract_range(start: int, stop: int) -> List[str]:
+    return [_worker_doc[i].get_text() for i in range(start, stop)]
+
+
+def iter_pages(file_bytes: Union[bytes, bytearray]) -> Iterator[Dict]:
+    """
+    Yield {"page": number, "text": ...} in page order (pages numbered from 1).
+
+    Large PDFs are sharded into page ranges extracted in parallel worker
+    processes; pages are yielded as soon as their range is done, so callers
+    can start chunking before extraction finishes.
+    """
+    file_bytes = bytes(file_bytes)
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        page_count = doc.page_count
+        if page_count < PARALLEL_MIN_PAGES or PDF_WORKERS < 2:
+            for i in range(page_count):
+                yield {"page": i + 1, "text": doc[i].get_text()}
+            return
+
+    starts = list(range(0, page_count, PAGES_PER_TASK))
+    stops = [min(start + PAGES_PER_TASK, page_count) for start in starts]
+    pool = ProcessPoolExecutor(
+        max_workers=min(PDF_WORKERS, len(starts)),
+        initializer=_open_in_worker,
+        initargs=(file_bytes,)
+    )
+    try:
+        # map() submits every range up front and returns results in order
+        for start, texts in zip(starts, pool.map(_extract_range, starts, stops)):
+            for offset, text in enumerate(texts):
+                yield {"page": start + offset + 1, "text": text}
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def extract_pages(file_bytes: Union[bytes, bytearray]) -> List[Dict]:
+    return list(iter_pages(file_bytes))
+
 
 def extract_text_from_pdf(file_bytes: Union[bytes, bytearray]) -> str:
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
-    full_text = ""
-    for page in doc:
-        full_text += page.get_text()
-    return full_text
\ No newline at end of file
+    return "".join(page["text"] for page in iter_pages(file_bytes))
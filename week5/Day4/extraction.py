@@ -0,0 +1,186 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import fitz  # PyMuPDF
+
+# A page is OCR'd when images cover at least this share of it, or when it has images but almost no text layer
+IMAGE_COVERAGE_THRESHOLD = float(os.getenv("IMAGE_COVERAGE_THRESHOLD", "0.5"))
+MIN_TEXT_CHARS = int(os.getenv("MIN_TEXT_CHARS", "100"))
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))
+EXTRACTION_CACHE_PATH = os.getenv(
+    "EXTRACTION_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "extraction_cache.sqlite")
+)
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def classify_page(page: "fitz.Page") -> Dict[str, Any]:
+    """Text length and image coverage of a page, and whether it needs OCR ("image") or not ("text")"""
+    text = page.get_text()
+    page_area = abs(page.rect) or 1.0
+    images = page.get_image_info()
+    covered = sum(abs(fitz.Rect(image["bbox"]) & page.rect) for image in images)
+    coverage = min(covered / page_area, 1.0)
+    chars = len(text.strip())
+    if images and (coverage >= IMAGE_COVERAGE_THRESHOLD or chars < MIN_TEXT_CHARS):
+        kind = "image"
+    else:
+        kind = "text"
+    return {"kind": kind, "chars": chars, "images": len(images), "image_coverage": round(coverage, 3), "text": text}
+
+
+# Everything stored per page besides its number, so cached pages look like fresh ones
+CACHED_FIELDS = ("kind", "source", "chars", "images", "image_coverage", "text")
+
+
+class ExtractionCache:
+    """Per-page extraction results keyed by (file hash, page), so re-ingesting a file skips OCR"""
+
+    def __init__(self, path: str = EXTRACTION_CACHE_PATH):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            # Replaces the older `pages` table, which held only kind and text
+            self.conn.execute("DROP TABLE IF EXISTS pages")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS page_extractions (
+                       file_hash TEXT NOT NULL,
+                       page INTEGER NOT NULL,
+                       kind TEXT NOT NULL,
+                       source TEXT NOT NULL,
+                       chars INTEGER NOT NULL,
+                       images INTEGER NOT NULL,
+                       image_coverage REAL NOT NULL,
+                       text TEXT NOT NULL,
+                       PRIMARY KEY (file_hash, page)
+                   )"""
+            )
+
+    def get(self, digest: str) -> Dict[int, Dict[str, Any]]:
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT page, {', '.join(CACHED_FIELDS)} FROM page_extractions WHERE file_hash = ?", (digest,)
+            )
+            return {row[0]: dict(zip(CACHED_FIELDS, row[1:])) for row in rows}
+
+    def put(self, digest: str, pages: List[Dict[str, Any]]) -> None:
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO page_extractions (file_hash, page, {', '.join(CACHED_FIELDS)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(CACHED_FIELDS))})",
+                [(digest, page["page"], *(page[field] for field in CACHED_FIELDS)) for page in pages]
+            )
+
+
+# Each worker process loads the OCR model once and keeps it for every page it is sent
+_ocr_engine = None
+
+
+def _load_ocr_engine() -> None:
+    global _ocr_engine
+    from rapidocr_onnxruntime import RapidOCR
+    _ocr_engine = RapidOCR()
+
+
+def _ocr_page(path: str, page_number: int, dpi: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    with fitz.open(path) as doc:
+        image = doc[page_number].get_pixmap(dpi=dpi).tobytes("png")
+    result, _ = _ocr_engine(image)
+    text = "\n".join(line[1] for line in result or [])
+    return {"text": text, "seconds": time.perf_counter() - start}
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_cache: Optional[ExtractionCache] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=OCR_WORKERS, initializer=_load_ocr_engine)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def get_cache() -> ExtractionCache:
+    global _cache
+    if _cache is None:
+        _cache = ExtractionCache()
+    return _cache
+
+
+def extract_pdf(path: str) -> Dict[str, Any]:
+    """
+    Extract every page of the PDF at `path`.
+
+    Pages are classified first; text pages keep their text layer and only
+    image-heavy pages are rendered and OCR'd, in the worker pool. Results
+    are cached per (file hash, page), and each page reports how long it
+    took and whether it came from the cache.
+    """
+    started = time.perf_counter()
+    digest = file_hash(path)
+    cached = get_cache().get(digest)
+    pages: List[Dict[str, Any]] = []
+    futures = {}
+
+    with fitz.open(path) as doc:
+        for number, page in enumerate(doc):
+            if number in cached:
+                pages.append({"page": number, **cached[number], "cached": True, "seconds": 0.0})
+                continue
+            page_start = time.perf_counter()
+            info = classify_page(page)
+            source = "ocr" if info["kind"] == "image" else "text_layer"
+            entry = {"page": number, **info, "source": source, "cached": False,
+                     "seconds": time.perf_counter() - page_start}
+            if info["kind"] == "image":
+                futures[number] = get_executor().submit(_ocr_page, path, number, OCR_DPI)
+            pages.append(entry)
+
+    for entry in pages:
+        future = futures.get(entry["page"])
+        if future is not None:
+            ocr = future.result()
+            entry["text"] = ocr["text"]
+            entry["seconds"] += ocr["seconds"]
+        entry["seconds"] = round(entry["seconds"], 4)
+
+    get_cache().put(digest, [entry for entry in pages if not entry["cached"]])
+    return {
+        "file_hash": digest,
+        "pages": pages,
+        "timings": {
+            "total": round(time.perf_counter() - started, 4),
+            "text_pages": round(sum(p["seconds"] for p in pages if p["kind"] == "text"), 4),
+            "ocr_pages": round(sum(p["seconds"] for p in pages if p["kind"] == "image"), 4),
+        },
+        "counts": {
+            "text": sum(1 for p in pages if p["kind"] == "text"),
+            "image": sum(1 for p in pages if p["kind"] == "image"),
+            "cached": sum(1 for p in pages if p["cached"]),
+        },
+    }
@@ -0,0 +1,53 @@
+import importlib
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+# Heavy loaders, parsers and clients, imported on first use instead of at startup
+LAZY_IMPORTS = {
+    "pymupdf_loader": ("langchain_community.document_loaders", "PyMuPDFLoader"),
+    "text_loader": ("langchain_community.document_loaders", "TextLoader"),
+    "docling_loader": ("langchain_docling", "DoclingLoader"),
+    "hybrid_chunker": ("docling.chunking", "HybridChunker"),
+    "rapidocr_parser": ("langchain_community.document_loaders.parsers", "RapidOCRBlobParser"),
+    "llm_image_parser": ("langchain_community.document_loaders.parsers", "LLMImageBlobParser"),
+    "partition_pdf": ("unstructured.partition.pdf", "partition_pdf"),
+    "chat_openai": ("langchain_openai", "ChatOpenAI"),
+    "openai_embeddings": ("langchain_openai", "OpenAIEmbeddings"),
+    "chroma": ("langchain_chroma", "Chroma"),
+}
+
+_loaded: Dict[str, Any] = {}
+_load_times: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> Any:
+    """The class or function registered as `name`, importing its module the first time"""
+    if name in _loaded:
+        return _loaded[name]
+    if name not in LAZY_IMPORTS:
+        raise ValueError(f"Unknown lazy import: {name}")
+    with _lock:
+        if name not in _loaded:
+            module_name, attribute = LAZY_IMPORTS[name]
+            start = time.perf_counter()
+            _loaded[name] = getattr(importlib.import_module(module_name), attribute)
+            _load_times[name] = round(time.perf_counter() - start, 4)
+    return _loaded[name]
+
+
+def warm_up(names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Import the given (default: all) registered names now; reports seconds or the import error per name"""
+    results: Dict[str, Any] = {}
+    for name in names or LAZY_IMPORTS:
+        try:
+            lazy_import(name)
+            results[name] = {"loaded": True, "seconds": _load_times[name]}
+        except Exception as e:
+            results[name] = {"loaded": False, "error": str(e)}
+    return results
+
+
+def load_times() -> Dict[str, float]:
+    return dict(_load_times)
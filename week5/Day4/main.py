@@ -1,33 +1,49 @@
-from fastapi import FastAPI, UploadFile, File,HTTPException
-from langchain_community.document_loaders import TextLoader
-from langchain_docling import DoclingLoader
-from typing import Union
-from pprint import pprint
-from tabulate import tabulate
-import os
-import re
-import base64 
-import fitz
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_docling import DoclingLoader
-from docling.chunking import HybridChunker
-from langchain_community.document_loaders.parsers import RapidOCRBlobParser
-from langchain_openai import ChatOpenAI
-from langchain_community.document_loaders.parsers import LLMImageBlobParser
-from dotenv import load_dotenv 
-from routes import ingest_router,testrouter
+from startup_profile import profiler
+
+# Only what the routes need at startup; heavy parsers (Docling, unstructured,
+# RapidOCR, LLM image parsing) are imported on first use through lazy_imports
+with profiler:
+    import os
+    import threading
+    from typing import List, Optional
+    from fastapi import FastAPI, Query
+    from dotenv import load_dotenv
+    from routes import ingest_router,testrouter,extract_router
+    from extraction import shutdown_executor
+    from lazy_imports import load_times, warm_up
 load_dotenv()
-# from langchain_community.document_loaders import PyMuPDFLoader
-# from langchain_community.document_loaders.parsers import RapidOCRBlobParser
-from unstructured.partition.pdf import partition_pdf
 # os.environ["PATH"] += os.pathsep + r"C:\poppler\poppler-24.08.0\Library\bin"
 # os.environ["PATH"] += os.pathsep + r"C:\Program Files\Tesseract-OCR"
 
+# Comma-separated lazy imports to load in the background once the server is up, e.g. "pymupdf_loader,chroma"
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "")
+
 app = FastAPI()
 
 app.include_router(ingest_router)
 app.include_router(testrouter)
+app.include_router(extract_router)
+
+@app.on_event("startup")
+def mark_ready():
+    profiler.mark_ready()
+    names = [name.strip() for name in WARMUP_ON_STARTUP.split(",") if name.strip()]
+    if names:
+        threading.Thread(target=warm_up, args=(names,), daemon=True).start()
+
+@app.on_event("shutdown")
+def stop_ocr_workers():
+    shutdown_executor()
+
 @app.get("/")
 def read_root():
     return {"message": "Hello, World!"}
 
+@app.post("/warmup")
+def warmup(names: Optional[List[str]] = Query(None)):
+    """Import the heavy parsers now (all of them unless `names` is given) instead of on first request"""
+    return warm_up(names)
+
+@app.get("/startup/profile")
+def startup_profile():
+    return {**profiler.report(), "lazy_imports": load_times()}
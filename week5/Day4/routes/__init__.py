@@ -1,3 +1,4 @@
 from .ingest import router as ingest_router
 from .fitz_vs_langchain import testrouter
-__all__ = ["ingest_router","testrouter"]
\ No newline at end of file
+from .extract import extract_router
+__all__ = ["ingest_router","testrouter","extract_router"]
\ No newline at end of file
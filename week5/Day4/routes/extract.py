@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+
+from extraction import extract_pdf
+
+extract_router=APIRouter(prefix="/extract")
+
+OUTPUT_DIR = "./output_Dir"
+# Finished jobs (with their per-page text) kept for status queries before the oldest are dropped
+MAX_FINISHED_JOBS = int(os.getenv("EXTRACT_MAX_FINISHED_JOBS", "50"))
+
+_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def _evict_finished() -> None:
+    finished = [job_id for job_id, job in _jobs.items() if job["finished_at"] is not None]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job_id]
+
+
+def run_extraction(job_id: str, path: str) -> None:
+    with _jobs_lock:
+        _jobs[job_id]["status"] = "running"
+    try:
+        result = extract_pdf(path)
+        update = {"status": "completed", "result": result}
+    except Exception as e:
+        update = {"status": "failed", "error": str(e)}
+    with _jobs_lock:
+        _jobs[job_id].update(update, finished_at=time.time())
+        _evict_finished()
+
+
+@extract_router.post("/", status_code=202)
+def start_extraction(background_tasks: BackgroundTasks, file_name: str = "Attention.pdf"):
+    """Queue text/OCR extraction of a PDF in output_Dir; poll GET /extract/{job_id} for the result"""
+    path = os.path.join(OUTPUT_DIR, os.path.basename(file_name))
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"{file_name} not found")
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        _jobs[job_id] = {"job_id": job_id, "file": file_name, "status": "queued",
+                         "created_at": time.time(), "finished_at": None, "result": None, "error": None}
+    background_tasks.add_task(run_extraction, job_id, path)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@extract_router.get("/{job_id}")
+def extraction_status(job_id: str):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return dict(job)
@@ -1,28 +1,139 @@
-from fastapi import APIRouter, HTTPException    
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List
+
+from fastapi import APIRouter, HTTPException
+
+from lazy_imports import lazy_import
 router=APIRouter(prefix="/ingest")
 
+PDF_PATH = "./output_Dir/Attention.pdf"
+PERSIST_DIRECTORY = "./chroma_langchain_db"
+COLLECTION_NAME = "my_collection"
+# file path -> {"file_hash", "page_ids"} of everything already in the collection
+# (kept out of the tracked chroma_langchain_db directory, and gitignored)
+MANIFEST_PATH = "./ingest_manifest.json"
+
+_embeddings = None
+_vector_store = None
+_lock = threading.Lock()
+
+
+def get_embeddings():
+    global _embeddings
+    if _embeddings is None:
+        _embeddings = lazy_import("openai_embeddings")(model="text-embedding-3-small")
+    return _embeddings
+
+
+def get_vector_store():
+    """One Chroma client per process, shared by every request"""
+    global _vector_store
+    if _vector_store is None:
+        _vector_store = lazy_import("chroma")(
+            embedding_function=get_embeddings(),
+            collection_name=COLLECTION_NAME,
+            persist_directory=PERSIST_DIRECTORY,
+        )
+    return _vector_store
+
+
+@lru_cache(maxsize=256)
+def query_embedding(query: str) -> tuple:
+    return tuple(get_embeddings().embed_query(query))
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def page_id(source: str, text: str) -> str:
+    # Same page text from the same file always maps to the same id, so unchanged pages upsert onto themselves
+    return hashlib.sha256(f"{source}\0{text}".encode("utf-8")).hexdigest()
+
+
+def load_manifest() -> Dict[str, Dict]:
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: Dict[str, Dict]) -> None:
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def ingest_file(path: str) -> Dict[str, int]:
+    """
+    Bring the collection in line with the PDF at `path`.
+
+    A file whose hash is already in the manifest is skipped without being
+    parsed. Otherwise only pages whose content-hash id is not yet stored
+    are embedded, pages already stored get their current metadata, and
+    every other entry from this source is deleted, including old
+    UUID-keyed copies.
+    """
+    with _lock:
+        manifest = load_manifest()
+        digest = file_hash(path)
+        entry = manifest.get(path)
+        if entry and entry["file_hash"] == digest:
+            return {"pages": len(entry["page_ids"]), "embedded": 0, "deleted": 0}
+
+        docs = lazy_import("pymupdf_loader")(path).load()
+        ids = [page_id(path, doc.page_content) for doc in docs]
+        vector_store = get_vector_store()
+        existing = set(vector_store.get(ids=list(dict.fromkeys(ids)), include=[])["ids"])
+
+        new_docs, new_ids, seen = [], [], set()
+        kept: Dict[str, Dict] = {}
+        for doc, doc_id in zip(docs, ids):
+            if doc_id in existing:
+                # Same text, but the page number (or other metadata) may have moved
+                kept.setdefault(doc_id, doc.metadata)
+            elif doc_id not in seen:
+                seen.add(doc_id)
+                new_docs.append(doc)
+                new_ids.append(doc_id)
+        if new_docs:
+            vector_store.add_documents(documents=new_docs, ids=new_ids)
+        if kept:
+            vector_store._collection.update(ids=list(kept), metadatas=list(kept.values()))
+
+        stored = set(vector_store.get(where={"source": path}, include=[])["ids"])
+        if entry:
+            stored.update(entry["page_ids"])
+        stale: List[str] = sorted(stored - set(ids))
+        if stale:
+            vector_store.delete(ids=stale)
+
+        manifest[path] = {"file_hash": digest, "page_ids": ids}
+        save_manifest(manifest)
+        return {"pages": len(ids), "embedded": len(new_ids), "deleted": len(stale)}
+
+
 @router.get("/")
 def ingest_pdf():
     try:
-        file_path = "./output_Dir/Attention.pdf"   
-        loader = PyMuPDFLoader(file_path)
-        docs =loader.load()
+        stats = ingest_file(PDF_PATH)
+        print(f"Ingested {PDF_PATH}: {stats}")
         # splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        # chunks=splitter.create_documents(docs)       
-        embeddings=OpenAIEmbeddings(model="text-embedding-3-small")
-        # Invoke the chain (no arguments needed for loaders)
-        
-        vector_store = Chroma(embedding_function=OpenAIEmbeddings(model="text-embedding-3-small"),collection_name="my_collection",  persist_directory="./chroma_langchain_db",)
-        vector_store.add_documents(documents=docs)
-        results = vector_store.similarity_search_by_vector(
-        embedding=embeddings.embed_query("Attention"), k=1
+        # chunks=splitter.create_documents(docs)
+        results = get_vector_store().similarity_search_by_vector(
+        embedding=list(query_embedding("Attention")), k=1
         )
         for doc in results:
             print(f"* {doc.page_content} [{doc.metadata}]")
-        return results[0]     
+        return results[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
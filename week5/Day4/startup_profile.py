@@ -0,0 +1,59 @@
+import builtins
+import sys
+import time
+from typing import Any, Dict, List
+
+
+class ImportProfiler:
+    """
+    Context manager that times the imports made inside it.
+
+    Each module first imported while the profiler is active is recorded
+    with its cumulative import time (including the modules it pulls in),
+    like `python -X importtime`, but readable from the running app.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ready_at = None
+        self.imports: List[Dict[str, Any]] = []
+        self._depth = 0
+        self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        depth = self._depth
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            self.imports.append({"module": name, "depth": depth, "seconds": time.perf_counter() - start})
+
+    def __enter__(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc):
+        builtins.__import__ = self._original_import
+        return False
+
+    def mark_ready(self) -> None:
+        self.ready_at = time.perf_counter()
+
+    def report(self, limit: int = 25) -> Dict[str, Any]:
+        top_level = sorted((i for i in self.imports if i["depth"] == 0), key=lambda i: -i["seconds"])
+        slowest = sorted(self.imports, key=lambda i: -i["seconds"])[:limit]
+        return {
+            "ready_seconds": round(self.ready_at - self.started, 4) if self.ready_at else None,
+            "import_seconds": round(sum(i["seconds"] for i in top_level), 4),
+            "top_level": [{"module": i["module"], "seconds": round(i["seconds"], 4)} for i in top_level],
+            "slowest": [{"module": i["module"], "depth": i["depth"], "seconds": round(i["seconds"], 4)}
+                        for i in slowest],
+        }
+
+
+profiler = ImportProfiler()